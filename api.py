@@ -0,0 +1,245 @@
+"""不依赖 Streamlit 的分析接口，供页面（views/）和 HTTP 服务（service.py）共用。
+
+所有函数只读取进程内共享的数据和派生结构（data_loader 的缓存），
+返回 DataFrame / Series / dict；同一进程里的多个会话或请求共用一份数据。
+"""
+import pandas as pd
+
+import athlete_events
+import correlation
+import countries
+import data_loader
+import event_medals
+import gold_index
+import host_regression
+import medal_cube
+import medal_series
+import panel
+import roster
+import sankey
+
+HEATMAP_METRICS = ['GDP', 'GDP_WorldPercent', 'Gold', 'Total_Medals']
+
+
+# ---- 奖牌表 ----
+
+def medal_years(season='Summer'):
+    return medal_cube.get_cube(event_medals.load_medal_table(season)).years
+
+
+def medal_table(year, sort_by='Total', season='Summer'):
+    # 某一届按指定奖牌类型降序排列的奖牌表
+    cube = medal_cube.get_cube(event_medals.load_medal_table(season))
+    return cube.table(year, sort_by)[['Gold', 'Silver', 'Bronze', 'Total']].reset_index()
+
+
+def medal_range_table(start_year, end_year, sort_by='Total', season='Summer'):
+    # 年份区间内各届的合计奖牌表，由前缀和相减得到
+    cube = medal_cube.get_cube(event_medals.load_medal_table(season))
+    return cube.range_table(start_year, end_year, sort_by).reset_index()
+
+
+def rank_change(from_year, to_year, medal='Total', season='Summer'):
+    # 两届之间各国的名次变化，Change 为正表示名次上升
+    cube = medal_cube.get_cube(event_medals.load_medal_table(season))
+    return cube.rank_change(from_year, to_year, medal).reset_index()
+
+
+def medal_countries(season='Summer'):
+    # 奖牌表中出现过的国家（按首次出现的顺序），每份奖牌表只计算一次
+    medals_df = event_medals.load_medal_table(season)
+    return data_loader.cached_derived('medal_countries', lambda medals: medals['Country_Name'].unique(), medals_df,
+                                      extend=_extend_countries)
+
+
+def _extend_countries(names, frames, deltas):
+    # 追加新一届后只把新出现的国家接在末尾
+    added = deltas[0]['Country_Name'].unique()
+    added = added[~pd.Index(added).isin(names)]
+    if not len(added):
+        return names, None
+    return pd.Series([*names, *added], dtype=frames[0]['Country_Name'].dtype).unique(), None
+
+
+def country_medals(country, season='Summer'):
+    # 某国家每届的金银铜牌数及总数
+    return country_series(country, season).drop(columns='Is_Host')
+
+
+# ---- 东道主效应 ----
+
+def host_years(country, season='Summer'):
+    # 该国主办过该季奥运会的年份；主办国名与奖牌表写法可能不同，按统一的国家 ID 匹配
+    hosts_df = data_loader.load_hosts(columns=data_loader.HOST_TABLE_COLUMNS, season=season)
+    index = countries.get_index()
+    host_ids = index.ids_for_names(hosts_df['game_location'])
+    return hosts_df[host_ids.eq(index.id_for_name(country)).fillna(False).to_numpy(bool)]['game_year'].unique()
+
+
+def _host_regression(season):
+    medals_df = event_medals.load_medal_table(season)
+    hosts_df = data_loader.load_hosts(columns=data_loader.HOST_TABLE_COLUMNS, season=season)
+    return host_regression.get_host_regression(medals_df, hosts_df)
+
+
+def _medal_series(season):
+    return medal_series.get_medal_series(_host_regression(season))
+
+
+def country_series(country, season='Summer'):
+    # 某国家每届的奖牌数及是否为东道主（Is_Host），直接从预先排好序的时间序列中切片
+    return _medal_series(season).frame(country)
+
+
+def host_advantage(country, medal='Total', season='Summer'):
+    # 某国家某种奖牌的东道主效应回归结果（intercept, slope, r_squared, ...）
+    return _host_regression(season).fit(country, medal)
+
+
+def host_leaderboard(medal='Total', season='Summer'):
+    return _host_regression(season).leaderboard(medal)
+
+
+# ---- 经济实力 ----
+
+def _country_merged(medals_df, gdp_data, country):
+    # 选该国的奖牌数据
+    country_medals = medals_df[medals_df['Country_Name'] == country]
+    country_medals_yearly = country_medals.groupby('Year')[['Gold', 'Silver', 'Bronze']].sum().reset_index()
+    country_medals_yearly['Total_Medals'] = country_medals_yearly['Gold'] + country_medals_yearly['Silver'] + country_medals_yearly['Bronze']
+
+    return pd.merge(gdp_data, country_medals_yearly[['Year', 'Gold', 'Total_Medals']], on='Year', how='left')
+
+
+def _build_correlation(medals_df, economic_panel, country):
+    # 没有奥运会的年份在左连接后奖牌为空，按成对删除处理
+    gdp_data = economic_panel.series(country, panel.GDP_INDICATORS)
+    return correlation.CorrelationEngine(_country_merged(medals_df, gdp_data, country), HEATMAP_METRICS)
+
+
+def _extend_correlation(engine, frames, deltas, country):
+    # 奖牌表追加了新一届：该国没有新记录时沿用原结果；有新记录时把新增的奖牌加到原输入的对应年份上重建，
+    # 输入只有该国各年份的几十行，不必再从整张奖牌表中筛选
+    medals_delta, panel_delta = deltas
+    if panel_delta is not None:
+        return None
+    added = medals_delta[medals_delta['Country_Name'] == country]
+    if added.empty:
+        return engine, None
+    merged = engine.frame.set_index('Year')
+    added = _country_merged(added, merged[[]].reset_index(), country).set_index('Year')[['Gold', 'Total_Medals']].dropna()
+    merged.loc[added.index, ['Gold', 'Total_Medals']] = merged.loc[added.index, ['Gold', 'Total_Medals']].fillna(0) + added
+    return correlation.CorrelationEngine(merged.reset_index(), HEATMAP_METRICS), None
+
+
+def economic_correlation_engine(country='China'):
+    # 各指标按年份的前缀和只构建一次，任意年份区间的相关系数直接由前缀和得出
+    medals_df = data_loader.load_medals(columns=data_loader.MEDAL_TABLE_COLUMNS)
+    return data_loader.cached_derived(f'economic_correlation:{country}',
+                                      lambda medals, economic: _build_correlation(medals, economic, country),
+                                      medals_df, panel.get_panel(),
+                                      extend=lambda engine, frames, deltas: _extend_correlation(engine, frames, deltas, country))
+
+
+def economic_correlation(country='China', start_year=None, end_year=None, metrics=None):
+    # 年份区间内各指标的相关系数矩阵，默认为全部年份、全部指标
+    engine = economic_correlation_engine(country)
+    if not len(engine.years):
+        raise ValueError(f'no economic data for {country}')
+    start_year = engine.years.min() if start_year is None else start_year
+    end_year = engine.years.max() if end_year is None else end_year
+    return engine.corr(start_year, end_year, metrics)
+
+
+def economic_metrics(year=None):
+    # 所有国家的人均、单位 GDP 奖牌数，可限定年份
+    metrics = panel.get_medal_metrics(data_loader.load_medals(columns=data_loader.MEDAL_TABLE_COLUMNS))
+    return metrics if year is None else metrics[metrics['Year'] == year]
+
+
+# ---- 优势项目 ----
+
+def strong_event_catalog(season='Summer'):
+    return athlete_events.load_catalog(season)
+
+
+def _gold_lookup(season):
+    return gold_index.get_gold_index(athlete_events.load_gold(season))
+
+
+def strong_event_teams(sport, year, season='Summer', top=8):
+    """某项目某年金牌最多的代表队；不足 top 个时按名称补充没有金牌的代表队（金牌数为 0）。"""
+    # 按 (项目, 年份) 直接查出各代表队金牌数
+    gold_medals_by_country = _gold_lookup(season).teams_for_sport(sport, year)
+
+    gold_medals_by_country = gold_medals_by_country.sort_values('Gold Medals', ascending=False)
+
+    top_countries = gold_medals_by_country.head(top)
+
+    # 获取没有获得金牌的国家
+    all_countries = strong_event_catalog(season)['teams']
+    countries_with_gold = gold_medals_by_country['Team'].unique()
+    countries_without_gold = sorted(set(all_countries) - set(countries_with_gold))
+
+    if len(top_countries) < top:
+        remaining_countries = countries_without_gold[:top - len(top_countries)]
+        additional_countries = pd.DataFrame(remaining_countries, columns=['Team'])
+        additional_countries['Gold Medals'] = 0  # 没有金牌的国家，金牌数设为0
+        top_countries = pd.concat([top_countries, additional_countries], ignore_index=True)
+
+    # 重新排序
+    return top_countries.sort_values(by=['Gold Medals', 'Team'], ascending=[False, True])
+
+
+def strong_event_years(season='Summer'):
+    return _gold_lookup(season).years
+
+
+def strong_event_top_teams(year, n=20, season='Summer'):
+    return _gold_lookup(season).top_teams(year, n)
+
+
+def strong_event_flows(year, team=None, levels=('Team', 'Sport'), season='Summer', top=20):
+    """金牌在国家 → 大项（→ 小项）之间的流向，返回 sankey.build_sankey() 的结果。
+
+    team 为空时汇总该年金牌最多的 top 个代表队。
+    """
+    gold_lookup = _gold_lookup(season)
+    levels = list(levels)
+    if team is not None and levels == ['Team', 'Sport']:
+        by_sport = gold_lookup.sports_for_team(team, year)
+        by_sport = by_sport[by_sport['Gold Medals'] > 0].dropna()
+        return sankey.build_sankey(by_sport, levels, value_column='Gold Medals', colorscale='Blues')
+
+    # 多个国家或细分到小项时直接从金牌明细聚合
+    if team is None:
+        flow_rows = gold_lookup.rows_for_year(year)
+        flow_rows = flow_rows[flow_rows['Team'].isin(gold_lookup.top_teams(year, top)['Team'].unique())]
+    else:
+        flow_rows = gold_lookup.rows_for_team(team, year)
+    return sankey.build_sankey(flow_rows, levels, colorscale='Blues')
+
+
+# ---- 赛事级奖牌与运动员 ----
+
+def discipline_dominance(season=None, medal=None, top=3):
+    # medal 与其他接口写法一致（Gold / Silver / Bronze，Total 或留空为全部奖牌），转换为赛事级奖牌表的 GOLD 等
+    if medal == 'Total':
+        medal = None
+    elif medal is not None:
+        if medal not in medal_cube.MEDAL_TYPES:
+            raise ValueError(f'medal must be one of {", ".join(medal_cube.MEDAL_TYPES)}, got {medal!r}')
+        medal = medal.upper()
+    return event_medals.get_event_medals(season).discipline_dominance(medal=medal, top=top)
+
+
+def gender_split(season=None, country=None):
+    return event_medals.get_event_medals(season).gender_split(country=country)
+
+
+def team_share(season=None, country=None):
+    return event_medals.get_event_medals(season).team_share(country=country)
+
+
+def search_athletes(prefix, limit=roster.MAX_RESULTS):
+    return roster.get_roster().search(prefix, limit)
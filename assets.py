@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import os
+import threading
+
+import streamlit as st
+
+import data_loader
+
+STATIC_DIR = 'static'
+
+# 进程级缓存：{路径: ((mtime, size), css)}
+_css_cache = {}
+_lock = threading.Lock()
+
+
+def _static_url(path, digest):
+    # 开启 server.enableStaticServing 后 static/ 下的文件由 Streamlit 按 URL 提供，
+    # 查询参数带内容哈希，文件变化时浏览器会重新获取
+    relative = os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')
+    return f'app/static/{relative}?v={digest}'
+
+
+def _in_static_dir(path):
+    return os.path.abspath(path).startswith(os.path.abspath(STATIC_DIR) + os.sep)
+
+
+def background_css(path):
+    """整页背景图的 CSS，每个进程只读取并编码一次图片。
+
+    图片位于 static/ 且开启了静态文件服务时引用 URL，浏览器可以缓存，
+    每次交互不再重复发送图片内容；否则退回内联的 base64 data URL。
+    """
+    signature = data_loader.file_signature(path)
+    entry = _css_cache.get(path)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    with _lock:
+        with open(path, 'rb') as f:
+            content = f.read()
+        ext = os.path.splitext(path)[1].lstrip('.').lower() or 'gif'
+        if st.get_option('server.enableStaticServing') and _in_static_dir(path):
+            url = _static_url(path, hashlib.sha256(content).hexdigest()[:12])
+        else:
+            url = f'data:image/{ext};base64,{base64.b64encode(content).decode()}'
+        css = f"""
+        <style>
+        .stApp {{
+            background: url({url});
+            background-size: cover;
+            background-attachment: fixed;
+            height: 100vh;  /* Full height of the screen */
+        }}
+        </style>
+        """
+        _css_cache[path] = (signature, css)
+        return css
@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+import data_loader
+import instrument
+import snapshot
+
+ATHLETE_EVENTS_FILE = os.path.join(data_loader.INPUT_DIR, 'athlete_events.csv')
+
+CHUNK_SIZE = 50000
+
+# 只读取需要的列，其余长文本列（姓名、Games 等）不进入内存
+READ_COLUMNS = ['Year', 'Season', 'Team', 'Sport', 'Event', 'Medal']
+READ_DTYPES = {
+    'Year': 'int16',
+    'Season': 'string',
+    'Team': 'string',
+    'Sport': 'string',
+    'Event': 'string',
+    'Medal': 'string',
+}
+GOLD_COLUMNS = ['Year', 'Event', 'Team', 'Sport']
+DEDUP_SUBSET = ['Year', 'Event', 'Team']
+
+# 每个季节一张去重金牌表快照，只加载所选季节的那一份
+SNAPSHOT_NAMES = {season: f'{season.lower()}_gold' for season in data_loader.SEASONS}
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def _empty_gold():
+    return pd.DataFrame({column: pd.Series(dtype=READ_DTYPES[column]) for column in GOLD_COLUMNS})
+
+
+def scan(path=ATHLETE_EVENTS_FILE, chunksize=CHUNK_SIZE):
+    """分块读取 athlete_events.csv，按季节分别生成去重金牌表。
+
+    返回 {季节: (gold_df, catalog)}，catalog 记录该季节的全部项目（按首次出现顺序）、
+    年份和代表队，供下拉框和补零使用。
+    """
+    gold_chunks = {season: [] for season in data_loader.SEASONS}
+    sports = {season: {} for season in data_loader.SEASONS}
+    years = {season: set() for season in data_loader.SEASONS}
+    teams = {season: set() for season in data_loader.SEASONS}
+    for chunk in pd.read_csv(path, usecols=READ_COLUMNS, dtype=READ_DTYPES, chunksize=chunksize):
+        for season, part in chunk.groupby('Season', sort=False):
+            if season not in gold_chunks:
+                continue
+            sports[season].update(dict.fromkeys(part['Sport'].unique()))
+            years[season].update(int(year) for year in part['Year'].unique())
+            teams[season].update(part['Team'].unique())
+
+            gold = part.loc[part['Medal'] == 'Gold', GOLD_COLUMNS]
+            # 块内先去重，控制累积的数据量
+            gold_chunks[season].append(gold.drop_duplicates(subset=DEDUP_SUBSET))
+
+    result = {}
+    for season in data_loader.SEASONS:
+        if gold_chunks[season]:
+            gold = pd.concat(gold_chunks[season], ignore_index=True).drop_duplicates(subset=DEDUP_SUBSET)
+        else:
+            gold = _empty_gold()
+        gold = gold.astype({'Event': 'category', 'Team': 'category', 'Sport': 'category'}).reset_index(drop=True)
+
+        catalog = {
+            'sports': list(sports[season]),
+            'years': sorted(years[season]),
+            'teams': sorted(teams[season]),
+        }
+        result[season] = (gold, catalog)
+    return result
+
+
+def _catalog_path(season, snapshot_dir=snapshot.SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f'{SNAPSHOT_NAMES[season]}.json')
+
+
+def build_snapshot(path=ATHLETE_EVENTS_FILE, snapshot_dir=snapshot.SNAPSHOT_DIR):
+    # 扫描一次并持久化各季节去重后的金牌表，之后的会话无需再读取原始文件
+    golds = scan(path)
+    if snapshot.available():
+        os.makedirs(snapshot_dir, exist_ok=True)
+        manifest_file = os.path.join(snapshot_dir, 'manifest.json')
+        manifest = snapshot.load_manifest(manifest_file)
+        manifest = {'sources': dict(manifest.get('sources', {}))}
+        source = snapshot.source_entry(path)
+        for season, (gold, catalog) in golds.items():
+            snapshot.write(SNAPSHOT_NAMES[season], gold, snapshot_dir)
+            with open(_catalog_path(season, snapshot_dir), 'w', encoding='utf-8') as f:
+                json.dump(catalog, f)
+            entry = dict(source, rows=len(gold), columns=list(gold.columns), season=season)
+            manifest['sources'][SNAPSHOT_NAMES[season]] = entry
+        snapshot.save_manifest(manifest, manifest_file)
+    return golds
+
+
+def _load(season, path=ATHLETE_EVENTS_FILE):
+    signature = data_loader.file_signature(path)
+    key = (path, season)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with instrument.stage(f'load:{SNAPSHOT_NAMES[season]}'):
+            gold = snapshot.read(SNAPSHOT_NAMES[season], path)
+            if gold is not None and os.path.exists(_catalog_path(season)):
+                with open(_catalog_path(season), encoding='utf-8') as f:
+                    catalog = json.load(f)
+                _cache[key] = (signature, (gold, catalog))
+            else:
+                # 快照缺失或过期时重新扫描，顺带缓存所有季节
+                for scanned_season, value in build_snapshot(path).items():
+                    _cache[(path, scanned_season)] = (signature, value)
+        return _cache[key][1]
+
+
+# 返回的 DataFrame 在所有会话间共享，调用方不要原地修改
+def load_gold(season='Summer', path=ATHLETE_EVENTS_FILE):
+    return _load(season, path)[0]
+
+
+def load_catalog(season='Summer', path=ATHLETE_EVENTS_FILE):
+    return _load(season, path)[1]
@@ -0,0 +1,367 @@
+"""各分析页面分支的基准测试。
+
+用法: python benchmark.py [--scales 1,10,100] [--repeat 20] [--save baseline.json] [--compare baseline.json]
+
+每个规模在独立的工作目录和子进程中运行：scale=1 为 input/ 的原样拷贝，其余规模把每个
+国家（奥委会代码、国家名、代表队）复制 scale 份，奖牌表（含 input/editions/ 下追加的新一届分区）、赛事级奖牌表和 athlete_events.csv
+的行数随之增长；GDP、人口、主办表和 Athletes.xlsx 保持原样。数据生成后先运行
+convert_inputs.py 写出快照，与部署时一致。
+
+每个分支不经过 Streamlit 服务直接调用页面的 render()（bare 模式下控件取默认值），
+包含数据计算和图表构建：
+  cold  每次先清空进程内的数据和派生缓存，包括读取快照和构建派生结构；
+  warm  缓存已建立后再次渲染，即用户切换控件时的开销；
+  peak  单独一次冷启动运行中 tracemalloc 记录的内存峰值（MB，Python/NumPy 分配，不含 Arrow 内存池；
+        子进程的最大 RSS 另外报告）。
+1000x 的数据集约 5 GB，需要显式传入 --scales。
+结果可保存为 JSON 基线，之后用 --compare 对比，超出容差时返回非零。
+每个规模还检查热力图相关系数与 DataFrame.corr() 的最大误差（见 correlation.max_error），超出容差时同样返回非零。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCALES = [1, 10, 100]
+PERCENTILES = [50, 90, 99]
+
+# 分支名 -> (views.PAGES 中的页面, render() 参数)
+CASES = {
+    'overview/data': ('Overall Overview', {'analysis_subtype': 'Data'}),
+    'overview/data-winter': ('Overall Overview', {'analysis_subtype': 'Data', 'season': 'Winter'}),
+    'overview/map': ('Overall Overview', {'analysis_subtype': 'Map'}),
+    'overview/year-range': ('Overall Overview', {'analysis_subtype': 'Year Range'}),
+    'overview/rank-change': ('Overall Overview', {'analysis_subtype': 'Rank Change'}),
+    'host/line': ('Host Advantage', {'selected_country': 'United States', 'medal_type': 'Gold', 'chart_type': 'Line Chart'}),
+    'host/box': ('Host Advantage', {'selected_country': 'United States', 'medal_type': 'Gold', 'chart_type': 'Box Plot'}),
+    'host/regression': ('Host Advantage', {'selected_country': 'United States', 'medal_type': 'Gold', 'chart_type': 'Regression Analysis'}),
+    'host/leaderboard': ('Host Advantage', {'selected_country': 'United States', 'medal_type': 'Total', 'chart_type': 'Host Advantage Leaderboard'}),
+    'economic/line': ('Impact on Economic Strength', {'chart_type': 'Line Chart', 'selected_country': 'China'}),
+    'economic/heatmap': ('Impact on Economic Strength', {'chart_type': 'Heatmap', 'selected_country': 'China'}),
+    'economic/comparison': ('Impact on Economic Strength', {'chart_type': 'Cross-Country Comparison'}),
+    'strong/bar': ('Bonus for Strong Events', {'chart_type': 'Bar Chart'}),
+    'strong/sankey': ('Bonus for Strong Events', {'chart_type': 'Sankey Diagram'}),
+    'athletes/search': ('Athlete Search', {'query': 'zhang'}),
+}
+
+# 分支依赖的可选数据文件（相对工作目录），缺失时跳过
+CASE_REQUIRES = {
+    'strong/bar': os.path.join('input', 'athlete_events.csv'),
+    'strong/sankey': os.path.join('input', 'athlete_events.csv'),
+    'athletes/search': os.path.join('input', 'Athletes.xlsx'),
+}
+
+
+# ---- 合成数据 ----
+
+def _clone(df, scale, name_columns=(), code_columns=()):
+    """把 df 复制 scale 份，第 i 份（i > 0）中的国家名追加 " i"、国家代码追加 i，缺失值保持不变。"""
+    if scale == 1:
+        return df
+    result = pd.concat([df] * scale, ignore_index=True)
+    copy = np.repeat(np.arange(scale), len(df)).astype(str)
+    first = np.repeat(np.arange(scale) == 0, len(df))
+    for columns, sep in ((name_columns, ' '), (code_columns, '')):
+        suffix = np.where(first, '', np.char.add(sep, copy)).astype(object)
+        for column in columns:
+            values = result[column]
+            result[column] = values.where(values.isna(), values.astype(str) + suffix)
+    return result
+
+
+def _scale_medals(src, dst, scale):
+    df = pd.read_csv(src, delimiter=';', dtype=str, keep_default_na=False, na_values=[''])
+    # Country_Code 形如 "(USA)"，复制后为 "(USA1)"
+    df['Country_Code'] = df['Country_Code'].str.strip('()')
+    df = _clone(df, scale, name_columns=['Country_Name'], code_columns=['Country_Code'])
+    df['Country_Code'] = '(' + df['Country_Code'] + ')'
+    df.to_csv(dst, sep=';', index=False)
+
+
+def _scale_olympic_medals(src, dst, scale):
+    df = pd.read_csv(src, dtype=str, keep_default_na=False, na_values=[''])
+    df = _clone(df, scale, name_columns=['country_name', 'participant_title'],
+                code_columns=['country_code', 'country_3_letter_code'])
+    df.to_csv(dst, index=False)
+
+
+def _scale_noc_regions(src, dst, scale):
+    df = pd.read_csv(src, dtype=str)
+    df = _clone(df, scale, name_columns=['region'], code_columns=['NOC'])
+    df.to_csv(dst, index=False)
+
+
+def _scale_athlete_events(src, dst, scale):
+    # 按块复制，避免整表放进内存
+    first = True
+    for chunk in pd.read_csv(src, dtype=str, keep_default_na=False, na_values=[''], chunksize=200000):
+        _clone(chunk, scale, name_columns=['Team'], code_columns=['NOC']).to_csv(
+            dst, mode='w' if first else 'a', header=first, index=False)
+        first = False
+
+
+# 随国家数增长的数据文件 -> 复制函数，其余文件原样拷贝
+SCALED_FILES = {
+    'Country_Medals.csv': _scale_medals,
+    'olympic_medals.csv': _scale_olympic_medals,
+    'noc_regions.csv': _scale_noc_regions,
+    'athlete_events.csv': _scale_athlete_events,
+}
+# ingest.py 追加的新一届分区（editions/<数据源>/*.csv）-> 复制函数，与对应的原始文件一致
+SCALED_EDITIONS = {
+    'medals': _scale_medals,
+}
+
+
+def _scaler(path):
+    # path 为相对 input/ 的路径；不需要复制国家的文件返回 None
+    parts = path.split(os.sep)
+    if len(parts) == 1:
+        return SCALED_FILES.get(path)
+    if len(parts) == 3 and parts[0] == 'editions':  # data_loader.EDITIONS_DIR
+        return SCALED_EDITIONS.get(parts[1])
+    return None
+
+
+def make_dataset(scale, input_dir, workdir):
+    """在 workdir 下生成 input/（按 scale 复制国家）并写出快照；已生成过的直接复用。"""
+    marker = os.path.join(workdir, 'dataset.json')
+    if os.path.exists(marker):
+        return workdir
+    target = os.path.join(workdir, 'input')
+    os.makedirs(target, exist_ok=True)
+    start = time.perf_counter()
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.relpath(os.path.join(root, name), input_dir)
+            src, dst = os.path.join(input_dir, path), os.path.join(target, path)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            scaler = _scaler(path)
+            if scaler is not None and scale > 1:
+                scaler(src, dst, scale)
+            else:
+                shutil.copyfile(src, dst)
+    subprocess.run([sys.executable, os.path.join(REPO_DIR, 'convert_inputs.py')], cwd=workdir,
+                   env=_worker_env(), check=True, capture_output=True)
+    sizes = {os.path.relpath(os.path.join(root, name), target): os.path.getsize(os.path.join(root, name))
+             for root, _, files in os.walk(target) for name in files}
+    with open(marker, 'w') as f:
+        json.dump({'scale': scale, 'bytes': sizes, 'seconds': time.perf_counter() - start}, f)
+    return workdir
+
+
+def _worker_env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_DIR, env.get('PYTHONPATH')]))
+    return env
+
+
+# ---- 子进程中的测量 ----
+
+def _reset():
+    import athlete_events
+    import data_loader
+    import disk_cache
+    data_loader.clear_cache()
+    athlete_events.clear_cache()
+    # 页面的图表经 disk_cache 取得，其进程内结果也要丢弃，否则冷启动只测到缓存命中
+    disk_cache.clear()
+
+
+def _summary(timings):
+    timings = np.asarray(timings) * 1000
+    result = {f'p{q}': float(np.percentile(timings, q)) for q in PERCENTILES}
+    result.update(mean=float(timings.mean()), min=float(timings.min()), max=float(timings.max()), n=len(timings))
+    return result
+
+
+def measure(render, options, repeat, cold_repeat):
+    cold = []
+    for _ in range(cold_repeat):
+        _reset()
+        start = time.perf_counter()
+        render(**options)
+        cold.append(time.perf_counter() - start)
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(**options)
+        warm.append(time.perf_counter() - start)
+
+    # 内存峰值单独测一次，tracemalloc 的开销不计入耗时
+    _reset()
+    tracemalloc.start()
+    render(**options)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'cold': _summary(cold), 'warm': _summary(warm), 'peak_mb': peak / 2 ** 20}
+
+
+def run_worker(cases, repeat, cold_repeat):
+    # 在数据集的工作目录中运行，输出 {分支: 结果} 的 JSON
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')  # bare 模式下每个控件都会警告缺少 ScriptRunContext
+    import views
+
+    results = {}
+    for case in cases:
+        page_name, options = CASES[case]
+        required = CASE_REQUIRES.get(case)
+        if required and not os.path.exists(required):
+            results[case] = {'skipped': f'{required} not found'}
+            continue
+        page = views.load_page(page_name)
+        results[case] = measure(page.render, options, repeat, cold_repeat)
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:  # Windows
+        max_rss = None
+    return {'cases': results, 'max_rss_mb': max_rss, 'checks': run_checks()}
+
+
+def run_checks():
+    # 增量/前缀和实现与直接计算结果的最大误差，{检查名: (误差, 容差)}
+    import api
+    import correlation
+    _reset()
+    return {'economic_correlation': (correlation.max_error(api.economic_correlation_engine()), correlation.TOLERANCE)}
+
+
+def failed_checks(report):
+    return [(scale, name, error, tolerance) for scale, result in report['scales'].items()
+            for name, (error, tolerance) in result.get('checks', {}).items() if not error <= tolerance]
+
+
+# ---- 汇总与对比 ----
+
+def run(scales, cases, repeat, cold_repeat, input_dir='input', workdir=None):
+    keep = workdir is not None
+    workdir = workdir or tempfile.mkdtemp(prefix='olympic-bench-')
+    input_dir = os.path.abspath(input_dir)
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'cold_repeat': cold_repeat,
+        'scales': {},
+    }
+    try:
+        for scale in scales:
+            dataset = make_dataset(scale, input_dir, os.path.join(workdir, f'x{scale}'))
+            args = [sys.executable, os.path.abspath(__file__), '--worker', '--repeat', str(repeat),
+                    '--cold-repeat', str(cold_repeat), '--cases', ','.join(cases)]
+            output = subprocess.run(args, cwd=dataset, env=_worker_env(), check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.splitlines()[-1])
+            with open(os.path.join(dataset, 'dataset.json')) as f:
+                result['input_bytes'] = sum(json.load(f)['bytes'].values())
+            report['scales'][str(scale)] = result
+            print_scale(scale, result)
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def print_scale(scale, result):
+    print(f'\nscale {scale}x  (input {result["input_bytes"] / 2 ** 20:.1f} MB, max RSS {result["max_rss_mb"] or 0:.0f} MB)')
+    print(f'{"case":<24}{"cold p50":>10}{"cold p90":>10}{"warm p50":>10}{"warm p90":>10}{"warm p99":>10}{"peak MB":>10}')
+    for case, stats in result['cases'].items():
+        if 'skipped' in stats:
+            print(f'{case:<24}  skipped: {stats["skipped"]}')
+            continue
+        cold, warm = stats['cold'], stats['warm']
+        print(f'{case:<24}{cold["p50"]:>10.1f}{cold["p90"]:>10.1f}{warm["p50"]:>10.2f}{warm["p90"]:>10.2f}'
+              f'{warm["p99"]:>10.2f}{stats["peak_mb"]:>10.1f}')
+    for name, (error, tolerance) in result.get('checks', {}).items():
+        print(f'check {name}: max error {error:.2e} (tolerance {tolerance:.0e}){"" if error <= tolerance else "  FAILED"}')
+
+
+# 对比的指标 -> 忽略的绝对差（毫秒或 MB），避免很小的数值因噪声误报
+COMPARED_METRICS = {
+    ('cold', 'p50'): 5.0,
+    ('warm', 'p50'): 1.0,
+    ('peak_mb',): 1.0,
+}
+
+
+def _metric(stats, path):
+    for key in path:
+        stats = stats[key]
+    return stats
+
+
+def compare(report, baseline, tolerance=0.25):
+    """返回超出基线 (1 + tolerance) 倍的 (规模, 分支, 指标, 基线值, 当前值) 列表。"""
+    regressions = []
+    for scale, result in report['scales'].items():
+        base_result = baseline['scales'].get(scale)
+        if base_result is None:
+            continue
+        for case, stats in result['cases'].items():
+            base_stats = base_result['cases'].get(case)
+            if base_stats is None or 'skipped' in stats or 'skipped' in base_stats:
+                continue
+            for path, slack in COMPARED_METRICS.items():
+                old, new = _metric(base_stats, path), _metric(stats, path)
+                if new > old * (1 + tolerance) and new - old > slack:
+                    regressions.append((scale, case, '.'.join(path), old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every analysis branch on input/ and on scaled synthetic data.')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='comma-separated dataset scales, e.g. 1,10,100,1000')
+    parser.add_argument('--cases', default=','.join(CASES), help='comma-separated case names (default: all)')
+    parser.add_argument('--repeat', type=int, default=20, help='warm renders per case')
+    parser.add_argument('--cold-repeat', type=int, default=5, help='renders per case after clearing all caches')
+    parser.add_argument('--input', default='input', help='source data directory')
+    parser.add_argument('--workdir', help='keep generated datasets here and reuse them on later runs')
+    parser.add_argument('--save', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', help='compare against a JSON baseline; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown relative to the baseline')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    cases = [case for case in args.cases.split(',') if case]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f'unknown cases: {", ".join(sorted(unknown))}')
+    if args.worker:
+        print(json.dumps(run_worker(cases, args.repeat, args.cold_repeat)))
+        return 0
+
+    report = run([int(scale) for scale in args.scales.split(',')], cases, args.repeat, args.cold_repeat,
+                 args.input, args.workdir)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    # 结果正确性检查不依赖基线，超出容差时总是返回非零
+    failures = failed_checks(report)
+    for scale, name, error, tolerance in failures:
+        print(f'CHECK FAILED {scale}x {name}: max error {error:.2e} > {tolerance:.0e}')
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for scale, case, metric, old, new in regressions:
+            print(f'REGRESSION {scale}x {case} {metric}: {old:.2f} -> {new:.2f}')
+    return int(bool(regressions or failures))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
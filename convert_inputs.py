@@ -0,0 +1,85 @@
+"""将 input/ 下的原始数据转换为列式快照。
+
+用法: python convert_inputs.py [数据源名称 ...]
+
+每个数据源写成一个未压缩的 Feather 文件（可内存映射），并在
+snapshot/manifest.json 中记录原始文件的大小、mtime 和 sha256。
+按季节分区的数据源另外为每个季节写一个快照（如 olympic_medals.winter）。
+原始文件变化后快照自动视为过期，加载时回退到原始文件。
+"""
+import argparse
+import os
+import sys
+import time
+
+import athlete_events
+import data_loader
+import snapshot
+
+
+def convert(names=None, snapshot_dir=snapshot.SNAPSHOT_DIR):
+    if not snapshot.available():
+        raise RuntimeError('pyarrow is required to build snapshots')
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest_file = os.path.join(snapshot_dir, 'manifest.json')
+    manifest = snapshot.load_manifest(manifest_file)
+    manifest = {'sources': dict(manifest.get('sources', {}))}
+
+    for name, (path, reader) in data_loader.SOURCES.items():
+        if names and name not in names:
+            continue
+        if not os.path.exists(path):
+            print(f'skip {name}: {path} not found')
+            continue
+        start = time.perf_counter()
+        try:
+            df = reader(path)
+        except ImportError as e:  # 例如缺少 openpyxl 时无法读取 xlsx
+            print(f'skip {name}: {e}')
+            continue
+        snapshot.write(name, df, snapshot_dir)
+        entry = snapshot.source_entry(path)
+        entry['version'] = data_loader.snapshot_version(name)
+        entry['rows'] = len(df)
+        entry['columns'] = list(df.columns)
+        manifest['sources'][name] = entry
+        print(f'{name}: {len(df)} rows from {path} in {time.perf_counter() - start:.2f}s')
+
+        if name in data_loader.SEASON_PARTITIONS:
+            seasons = data_loader.SEASON_PARTITIONS[name](df)
+            for season in data_loader.SEASONS:
+                part = df[(seasons == season).to_numpy(bool)]
+                part_name = data_loader.partition_name(name, season)
+                snapshot.write(part_name, part, snapshot_dir)
+                manifest['sources'][part_name] = dict(entry, rows=len(part), season=season)
+                depends = data_loader.PARTITION_DEPENDS.get(name)
+                if depends:
+                    manifest['sources'][part_name]['depends'] = snapshot.depends_entry(depends)
+                print(f'  {part_name}: {len(part)} rows')
+
+    snapshot.save_manifest(manifest, manifest_file)
+
+    # athlete_events.csv 体积大，分块扫描后只保存各季节的去重金牌表
+    gold_names = set(athlete_events.SNAPSHOT_NAMES.values())
+    if (not names or gold_names & set(names)) and os.path.exists(athlete_events.ATHLETE_EVENTS_FILE):
+        start = time.perf_counter()
+        golds = athlete_events.build_snapshot(snapshot_dir=snapshot_dir)
+        for season, (gold, _) in golds.items():
+            print(f'{athlete_events.SNAPSHOT_NAMES[season]}: {len(gold)} rows from {athlete_events.ATHLETE_EVENTS_FILE} '
+                  f'in {time.perf_counter() - start:.2f}s')
+    return snapshot.load_manifest(manifest_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert input/ sources into columnar snapshots.')
+    parser.add_argument('names', nargs='*', help='sources to convert (default: all)')
+    parser.add_argument('--output', default=snapshot.SNAPSHOT_DIR, help='snapshot directory')
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(data_loader.SOURCES) - set(athlete_events.SNAPSHOT_NAMES.values())
+    if unknown:
+        parser.error(f'unknown sources: {", ".join(sorted(unknown))}')
+    convert(args.names, args.output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
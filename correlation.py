@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+
+class CorrelationEngine:
+    """按年份前缀和回答任意年份区间、任意指标子集的皮尔逊相关系数矩阵。
+
+    构建时对每一对指标 (i, j) 累加两者都非空的行上的 n、Σx_i、Σx_i²、Σx_i·x_j，
+    查询时用区间两端的前缀和相减，代价为 O(k²)，与行数无关。
+    缺失值按成对删除处理，与 DataFrame.corr() 一致。
+    """
+
+    def __init__(self, frame, columns, year_column='Year'):
+        data = frame.sort_values(year_column, kind='stable')
+        # 按年份排序后的输入，追加数据时在此基础上重建
+        self.frame = data
+        self.columns = list(columns)
+        self.years = data[year_column].to_numpy()
+        self._position = {column: i for i, column in enumerate(self.columns)}
+
+        values = data[self.columns].to_numpy(dtype='float64')
+        valid = ~np.isnan(values)
+        values = np.where(valid, values, 0.0)
+        pair_valid = (valid[:, :, None] & valid[:, None, :]).astype('float64')
+
+        def prefix(a):
+            return np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(a, axis=0)])
+
+        self._count = prefix(pair_valid)
+        self._sum = prefix(values[:, :, None] * pair_valid)
+        self._sum_sq = prefix(values[:, :, None] ** 2 * pair_valid)
+        self._sum_xy = prefix(values[:, :, None] * values[:, None, :])
+
+    def _window(self, start_year, end_year):
+        lo = np.searchsorted(self.years, start_year, side='left')
+        hi = np.searchsorted(self.years, end_year, side='right')
+        return lo, max(lo, hi)
+
+    def corr(self, start_year, end_year, columns=None):
+        columns = self.columns if columns is None else list(columns)
+        idx = np.array([self._position[column] for column in columns], dtype=int)
+        lo, hi = self._window(start_year, end_year)
+
+        def window(a):
+            return (a[hi] - a[lo])[np.ix_(idx, idx)]
+
+        n = window(self._count)
+        sx = window(self._sum)
+        sxx = window(self._sum_sq)
+        sxy = window(self._sum_xy)
+        # sx[i, j] 为 (i, j) 都非空时 x_i 的和，其转置即 x_j 的和
+        sy = sx.T
+        syy = sxx.T
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = sxy - sx * sy / n
+            var_x = sxx - sx ** 2 / n
+            var_y = syy - sy ** 2 / n
+            r = cov / np.sqrt(var_x * var_y)
+        r = np.where((n >= 2) & (var_x > 0) & (var_y > 0), np.clip(r, -1.0, 1.0), np.nan)
+        diagonal = np.diag_indices_from(r)
+        r[diagonal] = np.where(np.isnan(r[diagonal]), np.nan, 1.0)
+        return pd.DataFrame(r, index=columns, columns=columns)
+
+
+# 与 DataFrame.corr() 的最大允许误差；前缀和相减会放大舍入误差，实测约 2e-10
+TOLERANCE = 1e-9
+
+
+def max_error(engine):
+    """对每个年份区间与 DataFrame.corr() 对比，返回最大绝对误差；NaN 的位置不一致时返回 inf。
+
+    成对删除下每对指标的结果与其他指标无关，任意指标子集的结果都是全部指标结果的子矩阵，
+    因此只需对比全部指标。
+    """
+    years = np.unique(engine.years)
+    worst = 0.0
+    for i, start_year in enumerate(years):
+        for end_year in years[i:]:
+            rows = (engine.years >= start_year) & (engine.years <= end_year)
+            expected = engine.frame.loc[rows, engine.columns].corr().to_numpy()
+            actual = engine.corr(start_year, end_year).to_numpy()
+            if (np.isnan(expected) != np.isnan(actual)).any():
+                return float('inf')
+            diff = np.abs(actual - expected)
+            if np.isfinite(diff).any():
+                worst = max(worst, float(np.nanmax(diff)))
+    return worst
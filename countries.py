@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+
+import data_loader
+
+# 同一国家奥委会更换过的代码，统一到现用代码
+CODE_ALIASES = {
+    'TRI': 'TTO',
+    'SIN': 'SGP',
+    'LIB': 'LBN',
+}
+
+# 与 ISO 3166-1 alpha-3 不同的奥委会代码；历史代表团归到今天所在的国家，
+# 混合队、独立运动员等没有对应国家的为 None；其余代码与 ISO-3 相同
+IOC_TO_ISO3 = {
+    'AHO': 'CUW', 'ALG': 'DZA', 'ANG': 'AGO', 'ANT': 'ATG', 'ANZ': 'AUS', 'ARU': 'ABW',
+    'ASA': 'ASM', 'BAH': 'BHS', 'BAN': 'BGD', 'BAR': 'BRB', 'BER': 'BMU', 'BHU': 'BTN',
+    'BIZ': 'BLZ', 'BOH': 'CZE', 'BOT': 'BWA', 'BRN': 'BHR', 'BRU': 'BRN', 'BUL': 'BGR',
+    'BUR': 'BFA', 'BWI': None, 'CAM': 'KHM', 'CAY': 'CYM', 'CEY': 'LKA', 'CGO': 'COG',
+    'CHA': 'TCD', 'CHI': 'CHL', 'CRC': 'CRI', 'CRO': 'HRV', 'CRT': 'GRC', 'DEN': 'DNK',
+    'ESA': 'SLV', 'EUA': 'DEU', 'EUN': 'RUS', 'FIJ': 'FJI', 'FRG': 'DEU', 'GAM': 'GMB',
+    'GBS': 'GNB', 'GDR': 'DEU', 'GEQ': 'GNQ', 'GER': 'DEU', 'GRE': 'GRC', 'GRN': 'GRD',
+    'GUA': 'GTM', 'GUI': 'GIN', 'HAI': 'HTI', 'HON': 'HND', 'INA': 'IDN', 'IOA': None,
+    'IOP': None, 'IRI': 'IRN', 'ISV': 'VIR', 'IVB': 'VGB', 'KOS': 'XKX', 'KSA': 'SAU',
+    'KUW': 'KWT', 'LAT': 'LVA', 'LBA': 'LBY', 'LES': 'LSO', 'MAD': 'MDG', 'MAL': 'MYS',
+    'MAS': 'MYS', 'MAW': 'MWI', 'MGL': 'MNG', 'MIX': None, 'MON': 'MCO', 'MRI': 'MUS',
+    'MTN': 'MRT', 'MYA': 'MMR', 'NBO': 'MYS', 'NCA': 'NIC', 'NED': 'NLD', 'NEP': 'NPL',
+    'NFL': 'CAN', 'NGR': 'NGA', 'NIG': 'NER', 'OAR': 'RUS', 'OMA': 'OMN', 'PAR': 'PRY',
+    'PHI': 'PHL', 'PLE': 'PSE', 'POR': 'PRT', 'PUR': 'PRI', 'RHO': 'ZWE', 'ROC': 'RUS',
+    'ROT': None, 'RSA': 'ZAF', 'RU1': 'RUS', 'SAA': 'DEU', 'SAM': 'WSM', 'SCG': 'SRB',
+    'SEY': 'SYC', 'SKN': 'KNA', 'SLO': 'SVN', 'SOL': 'SLB', 'SRI': 'LKA', 'SUD': 'SDN',
+    'SUI': 'CHE', 'TAN': 'TZA', 'TCH': 'CZE', 'TGA': 'TON', 'TOG': 'TGO', 'TPE': 'TWN',
+    'UAE': 'ARE', 'UAR': 'SYR', 'UNK': None, 'URS': 'RUS', 'URU': 'URY', 'VAN': 'VUT',
+    'VIE': 'VNM', 'VIN': 'VCT', 'WIF': None, 'YAR': 'YEM', 'YMD': 'YEM', 'YUG': 'SRB',
+    'ZAM': 'ZMB', 'ZIM': 'ZWE', 'ZZX': None,
+}
+
+# 各数据源里无法从代码对照出来的国家名写法（优先级最高）
+NAME_ALIASES = {
+    'Republic of China': 'TPE',
+    'USSR': 'URS',
+    'UK': 'GBR',
+    'United Kingdom': 'GBR',
+    'Czech Republic (Czechia)': 'CZE',
+    "Côte d'Ivoire": 'CIV',
+    'Taiwan': 'TPE',
+    'U.S. Virgin Islands': 'ISV',
+    'South Korea': 'KOR',
+    'North Korea': 'PRK',
+    'Russia': 'RUS',
+    'Iran': 'IRI',
+    'Syria': 'SYR',
+    'Vietnam': 'VIE',
+    'Moldova': 'MDA',
+    'Tanzania': 'TAN',
+    'Bolivia': 'BOL',
+    'Congo': 'CGO',
+    'DR Congo': 'COD',
+    'Eswatini': 'SWZ',
+    'State of Palestine': 'PLE',
+    'Cabo Verde': 'CPV',
+    'Sao Tome & Principe': 'STP',
+    'St. Vincent & Grenadines': 'VIN',
+    'St Vincent and the Grenadines': 'VIN',
+    'Saint Kitts & Nevis': 'SKN',
+    'Saint Kitts and Nevis': 'SKN',
+    'British Virgin Islands': 'IVB',
+    'Federated States of Micronesia': 'FSM',
+    'Brunei Darussalam': 'BRU',
+    "Lao People's Democratic Republic": 'LAO',
+    'Democratic Republic of Timor-Leste': 'TLS',
+}
+
+
+def _normalize_code(codes):
+    # "(USA)" -> "USA"，并合并改过名的代码
+    codes = codes.astype('string').str.strip('()')
+    return codes.replace(CODE_ALIASES)
+
+
+def _key(name):
+    return str(name).strip().casefold()
+
+
+class CountryIndex:
+    """各数据源的国家标识（奥委会代码、各种写法的国家名）到统一整数 ID 和 ISO-3 代码的对照表。
+
+    table 以 Country_ID 为索引，列为 NOC、Name（奖牌表中的最新写法）、Region、ISO3。
+    查询函数对输入先去重再查字典，返回与输入对齐的 Int16 序列（国家数超出 Int16 范围时为 Int32），
+    查不到的为空值。
+    """
+
+    def __init__(self, noc_regions_df, medals_df, olympic_medals_df):
+        noc = noc_regions_df.assign(NOC=_normalize_code(noc_regions_df['NOC']))
+        medal_pairs = pd.DataFrame({
+            'NOC': _normalize_code(medals_df['Country_Code']),
+            'Name': medals_df['Country_Name'].astype('string'),
+            'Year': medals_df['Year'],
+        }).dropna(subset=['NOC']).sort_values('Year', kind='stable')
+        olympic_pairs = pd.DataFrame({
+            'NOC': _normalize_code(olympic_medals_df['country_3_letter_code']),
+            'Name': olympic_medals_df['country_name'].astype('string'),
+        }).dropna().drop_duplicates()
+
+        codes = pd.Index(noc['NOC']).union(medal_pairs['NOC'].unique()).union(olympic_pairs['NOC'].unique())
+        codes = codes.dropna().sort_values()
+        self.table = pd.DataFrame({'NOC': codes.astype(str)})
+        self.table.index = pd.RangeIndex(len(codes), name='Country_ID')
+        self.id_dtype = 'Int16' if len(codes) <= np.iinfo('int16').max else 'Int32'
+
+        regions = noc.drop_duplicates('NOC').set_index('NOC')['region']
+        display = regions.copy()
+        display.update(olympic_pairs.drop_duplicates('NOC', keep='last').set_index('NOC')['Name'])
+        display.update(medal_pairs.drop_duplicates('NOC', keep='last').set_index('NOC')['Name'])
+        self.table['Name'] = self.table['NOC'].map(display).fillna(self.table['NOC']).astype(str)
+        self.table['Region'] = self.table['NOC'].map(regions).astype('string')
+        self.table['ISO3'] = self.table['NOC'].map(lambda code: IOC_TO_ISO3.get(code, code))
+
+        self._id_by_noc = dict(zip(self.table['NOC'], self.table.index))
+
+        # 名称 -> 代码，后面的来源覆盖前面的：noc_regions 的地区名与备注、olympic_medals、奖牌表、手工别名
+        names = {}
+        current = noc[noc['notes'].isna()]
+        for region, code in zip(current['region'][::-1], current['NOC'][::-1]):
+            if pd.notna(region):
+                names[_key(region)] = code
+        for note, code in zip(noc['notes'], noc['NOC']):
+            if pd.notna(note):
+                names.setdefault(_key(note), code)
+        for name, code in zip(olympic_pairs['Name'], olympic_pairs['NOC']):
+            names[_key(name)] = code
+        for name, code in zip(medal_pairs['Name'], medal_pairs['NOC']):
+            names[_key(name)] = code
+        for name, code in NAME_ALIASES.items():
+            names[_key(name)] = code
+        self._id_by_name = {name: self._id_by_noc[code] for name, code in names.items() if code in self._id_by_noc}
+
+    def _lookup(self, values, mapping, key):
+        # 先对输入去重再查字典；pd.factorize 对缺失值给出 -1，正好取到末尾的空值
+        values = pd.Series(values)
+        codes, uniques = pd.factorize(values)
+        found = pd.array([mapping.get(key(value)) for value in uniques] + [None], dtype=self.id_dtype)
+        return pd.Series(found[codes], index=values.index)
+
+    def ids_for_codes(self, codes):
+        # 奥委会代码（"USA" 或 "(USA)"）-> Country_ID
+        return self._lookup(_normalize_code(pd.Series(codes)), self._id_by_noc, str)
+
+    def ids_for_names(self, names):
+        # 任意来源的国家名 -> Country_ID
+        return self._lookup(names, self._id_by_name, _key)
+
+    def ids_for_teams(self, teams):
+        # athlete_events 的 Team 形如 "Germany-1"，去掉队伍编号后按国家名查找
+        teams = pd.Series(teams).astype('string').str.replace(r'-\d+$', '', regex=True)
+        return self.ids_for_names(teams)
+
+    def id_for_name(self, name):
+        return self._id_by_name.get(_key(name))
+
+    def iso3(self, ids):
+        # Country_ID -> ISO-3 代码，未知或没有对应国家的为空值
+        ids = pd.Series(ids)
+        return ids.map(self.table['ISO3'])
+
+    def medal_ids(self, medals_df):
+        # 奖牌表按国家名对照（部分年份没有 Country_Code，且 ROC 代码有歧义），名称查不到时再用代码
+        ids = self.ids_for_names(medals_df['Country_Name'])
+        if 'Country_Code' in medals_df:
+            ids = ids.fillna(self.ids_for_codes(medals_df['Country_Code']))
+        return ids
+
+
+def _extend_index(index, frames, deltas):
+    # 新一届奖牌表只用到已知的国家代码和现用写法时对照表不变，沿用原对象，依赖它的派生结构都不必重建
+    noc_delta, medals_delta, olympic_delta = deltas
+    if noc_delta is not None or olympic_delta is not None:
+        return None
+    codes = _normalize_code(medals_delta['Country_Code'])
+    for code, name in zip(codes, medals_delta['Country_Name'].astype('string')):
+        if pd.isna(code):
+            continue
+        country_id = index._id_by_noc.get(code)
+        if country_id is None or index._id_by_name.get(_key(name)) != country_id or index.table.at[country_id, 'Name'] != name:
+            return None
+    return index, None
+
+
+def get_index():
+    noc_regions_df = data_loader.load_noc_regions()
+    medals_df = data_loader.load_medals(columns=['Year', 'Country_Code', 'Country_Name'])
+    olympic_medals_df = data_loader.load_olympic_medals(columns=['country_name', 'country_3_letter_code'])
+    return data_loader.cached_derived('country_index', CountryIndex, noc_regions_df, medals_df, olympic_medals_df,
+                                      extend=_extend_index)
@@ -0,0 +1,535 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+import instrument
+import shared_data
+import snapshot
+
+INPUT_DIR = 'input'
+
+HOSTS_FILE = os.path.join(INPUT_DIR, 'olympic_hosts.csv')
+MEDALS_FILE = os.path.join(INPUT_DIR, 'Country_Medals.csv')
+GDP_FILE = os.path.join(INPUT_DIR, 'China_GDP.csv')
+OLYMPIC_MEDALS_FILE = os.path.join(INPUT_DIR, 'olympic_medals.csv')
+NOC_REGIONS_FILE = os.path.join(INPUT_DIR, 'noc_regions.csv')
+POPULATION_FILE = os.path.join(INPUT_DIR, 'population_by_country_2020.csv')
+ATHLETES_FILE = os.path.join(INPUT_DIR, 'Athletes.xlsx')
+
+# 显式声明列类型，国家/城市名使用 category 减少内存和比较开销
+HOSTS_DTYPES = {
+    'game_slug': 'string',
+    'game_end_date': 'string',
+    'game_start_date': 'string',
+    'game_location': 'category',
+    'game_name': 'string',
+    'game_season': 'category',
+    'game_year': 'int16',
+}
+
+MEDALS_DTYPES = {
+    'Year': 'int16',
+    'Country_Code': 'category',
+    'Country_Name': 'category',
+    'Host_city': 'category',
+    'Host_country': 'category',
+    'Gold': 'int32',
+    'Silver': 'int32',
+    'Bronze': 'int32',
+}
+
+GDP_DTYPES = {
+    'Year': 'int16',
+    'GDP': 'float64',
+    'GDP_WorldPercent': 'float64',
+}
+
+OLYMPIC_MEDALS_DTYPES = {
+    'discipline_title': 'category',
+    'slug_game': 'category',
+    'event_title': 'category',
+    'event_gender': 'category',
+    'medal_type': 'category',
+    'participant_type': 'category',
+    'participant_title': 'category',
+    'athlete_url': 'string',
+    'athlete_full_name': 'string',
+    'country_name': 'category',
+    'country_code': 'category',
+    'country_3_letter_code': 'category',
+}
+
+NOC_REGIONS_DTYPES = {
+    'NOC': 'string',
+    'region': 'string',
+    'notes': 'string',
+}
+
+ATHLETES_DTYPES = {
+    'Name': 'string',
+    'NOC': 'category',
+    'Discipline': 'category',
+}
+
+SEASONS = ['Summer', 'Winter']
+
+# 各页面用到的列
+MEDAL_TABLE_COLUMNS = ['Year', 'Country_Name', 'Gold', 'Silver', 'Bronze', 'Total']
+HOST_TABLE_COLUMNS = ['game_location', 'game_season', 'game_year']
+
+# 进程级缓存：{(数据源, 列, 季节): (源文件及其依赖文件的 (mtime, size), DataFrame)}
+_cache = {}
+# 派生结构缓存：{名称: OrderedDict{源数据 id: (源数据, 结果)}}，每个名称保留最近的几份，
+# 例如夏季、冬季两个分区各自的结果可以同时存在
+_derived_cache = {}
+DERIVED_SLOTS = 4
+_lock = threading.RLock()
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _derived_cache.clear()
+        _appended.clear()
+        _lineage.clear()
+        _shared.clear()
+
+
+# 追加数据的来历：{id(新对象): (新对象的弱引用, 旧对象, 增量)}。
+# 数据源追加新一届后得到的新 DataFrame、以及由旧派生结构增量更新得到的新结构都记在这里，
+# 下游的 cached_derived 据此只处理增量部分，不必从头构建
+_lineage = OrderedDict()
+LINEAGE_SLOTS = 64
+
+
+def record_append(new, old, delta):
+    try:
+        ref = weakref.ref(new)
+    except TypeError:  # 不支持弱引用的对象不记录，下游照常完整构建
+        return
+    with _lock:
+        _lineage[id(new)] = (ref, old, delta)
+        while len(_lineage) > LINEAGE_SLOTS:
+            _lineage.popitem(last=False)
+
+
+def appended_from(obj):
+    # obj 由追加得到时返回 (旧对象, 增量)，否则返回 None
+    entry = _lineage.get(id(obj))
+    if entry is None or entry[0]() is not obj:
+        return None
+    return entry[1], entry[2]
+
+
+def _extend_derived(name, slots, frames, extend):
+    # 找到一份输入均为当前输入本身或其追加前版本的旧结果，用 extend 增量更新
+    for old_frames, old_value in reversed(list(slots.values())):
+        deltas = []
+        for old, new in zip(old_frames, frames):
+            if old is new:
+                deltas.append(None)
+                continue
+            origin = appended_from(new)
+            if origin is None or origin[0] is not old:
+                break
+            deltas.append(origin[1])
+        else:
+            with instrument.stage(f'extend:{name}'):
+                result = extend(old_value, frames, tuple(deltas))
+            if result is None:
+                return None
+            value, delta = result
+            if value is not old_value and delta is not None:
+                record_append(value, old_value, delta)
+            return value
+    return None
+
+
+def cached_derived(name, builder, *frames, extend=None):
+    """基于已加载数据构建的派生结构（聚合表、索引等），每个进程只构建一次；源数据重新加载（对象改变）后自动重建。
+
+    extend(old_value, frames, deltas) 可选：输入由追加新数据得到时（见 record_append），
+    用旧结果和每个输入的增量（未变化的输入为 None）求出新结果，返回 (新结果, 新结果相对旧结果的增量)；
+    返回 None 时回退到完整构建。
+    """
+    ids = tuple(id(frame) for frame in frames)
+    entry = _derived_cache.get(name, {}).get(ids)
+    if entry is not None:
+        return entry[1]
+    with _lock:
+        slots = _derived_cache.setdefault(name, OrderedDict())
+        entry = slots.get(ids)
+        if entry is not None:
+            return entry[1]
+        value = _extend_derived(name, slots, frames, extend) if extend is not None else None
+        if value is None:
+            with instrument.stage(f'aggregate:{name}'):
+                value = builder(*frames)
+        slots[ids] = (frames, value)
+        while len(slots) > DERIVED_SLOTS:
+            slots.popitem(last=False)
+        return value
+
+
+class LRUCache:
+    """容量有限的进程级缓存，超出容量时淘汰最久未使用的条目。
+
+    用于按用户选择缓存的渲染结果（图表、HTML 表格），这类结果组合多、单个体积大，
+    不适合像 cached_derived 那样无限保留。
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, builder):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = builder()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def copy(self, keep=None):
+        # 新的缓存，带上 keep(key) 为真的条目（追加新数据后仍然有效的渲染结果）
+        cache = LRUCache(self.maxsize)
+        with self._lock:
+            cache._entries.update((key, value) for key, value in self._entries.items() if keep is None or keep(key))
+        return cache
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _read_hosts(path):
+    return pd.read_csv(path, dtype=HOSTS_DTYPES)
+
+
+def _read_medals(path):
+    df = pd.read_csv(path, delimiter=';', dtype=MEDALS_DTYPES)
+    # 计算总奖牌数
+    df['Total'] = df['Gold'] + df['Silver'] + df['Bronze']
+    return df
+
+
+def _read_gdp(path):
+    return pd.read_csv(path, dtype=GDP_DTYPES)
+
+
+def _read_olympic_medals(path):
+    return pd.read_csv(path, dtype=OLYMPIC_MEDALS_DTYPES)
+
+
+def _read_noc_regions(path):
+    # 该文件使用 CR 换行
+    return pd.read_csv(path, dtype=NOC_REGIONS_DTYPES)
+
+
+POPULATION_COLUMNS = {
+    'Country (or dependency)': 'Country',
+    'Population (2020)': 'Population',
+    'Yearly Change': 'Yearly_Change_Pct',
+    'Net Change': 'Net_Change',
+    'Density (P/Km²)': 'Density',
+    'Land Area (Km²)': 'Land_Area',
+    'Migrants (net)': 'Migrants',
+    'Fert. Rate': 'Fertility_Rate',
+    'Med. Age': 'Median_Age',
+    'Urban Pop %': 'Urban_Pop_Pct',
+    'World Share': 'World_Share_Pct',
+}
+
+
+def _read_population(path):
+    # 百分比列形如 "0.39 %"，缺失值为 "N.A."，读取时统一转成数值
+    df = pd.read_csv(path, na_values=['N.A.'], dtype=str).rename(columns=POPULATION_COLUMNS)
+    for column in df.columns:
+        if column == 'Country':
+            continue
+        df[column] = pd.to_numeric(df[column].str.rstrip(' %'), errors='coerce').astype('float64')
+    df['Population'] = df['Population'].astype('int64')
+    df['Country'] = df['Country'].astype('category')
+    return df
+
+
+def _read_athletes(path):
+    return pd.read_excel(path, dtype=ATHLETES_DTYPES)
+
+
+# 数据源名称 -> (原始文件, 读取函数)，convert_inputs.py 按此表生成快照
+SOURCES = {
+    'hosts': (HOSTS_FILE, _read_hosts),
+    'medals': (MEDALS_FILE, _read_medals),
+    'gdp': (GDP_FILE, _read_gdp),
+    'olympic_medals': (OLYMPIC_MEDALS_FILE, _read_olympic_medals),
+    'noc_regions': (NOC_REGIONS_FILE, _read_noc_regions),
+    'population': (POPULATION_FILE, _read_population),
+    'athletes': (ATHLETES_FILE, _read_athletes),
+}
+
+
+def _hosts_season(df):
+    return df['game_season']
+
+
+def _olympic_medals_season(df):
+    # 赛事级奖牌表本身没有季节列，按 slug_game 从主办表查出
+    hosts = load_hosts(columns=['game_slug', 'game_season'])
+    seasons = pd.Series(hosts['game_season'].to_numpy(), index=hosts['game_slug'].astype(str))
+    return df['slug_game'].astype(str).map(seasons)
+
+
+# 按季节分区的数据源 -> 求每行季节的函数；convert_inputs.py 为每个季节单独写快照
+SEASON_PARTITIONS = {
+    'hosts': _hosts_season,
+    'olympic_medals': _olympic_medals_season,
+}
+
+
+# 按季节划分时还依赖的文件：赛事级奖牌表的季节由主办表查出，主办表变化后分区随之失效
+PARTITION_DEPENDS = {
+    'olympic_medals': [HOSTS_FILE],
+}
+
+
+def partition_name(name, season):
+    return f'{name}.{season.lower()}'
+
+
+# 读取函数的输出格式变化时提高版本号，使旧快照失效（默认为 1）
+SNAPSHOT_VERSIONS = {
+    'population': 2,
+}
+
+
+def snapshot_version(name):
+    return SNAPSHOT_VERSIONS.get(name, 1)
+
+
+# 解析代价高的数据源（xlsx 需要 openpyxl 逐个单元格解析）：第一次回退到原始文件时
+# 顺便写出快照，之后的进程直接读取快照，无需先手动运行 convert_inputs.py
+AUTO_SNAPSHOT_SOURCES = {'athletes'}
+
+
+def _save_snapshot(name, path, df):
+    if not snapshot.available():
+        return
+    os.makedirs(snapshot.SNAPSHOT_DIR, exist_ok=True)
+    snapshot.write(name, df)
+    manifest = snapshot.load_manifest()
+    manifest = {'sources': dict(manifest.get('sources', {}))}
+    entry = snapshot.source_entry(path)
+    entry['version'] = snapshot_version(name)
+    entry['rows'] = len(df)
+    entry['columns'] = list(df.columns)
+    manifest['sources'][name] = entry
+    snapshot.save_manifest(manifest)
+
+
+def _load_base(name, columns=None, season=None):
+    # 优先读取未过期的列式快照（只读需要的列），否则回退到解析原始文件；
+    # 指定季节时只读取该季节的分区快照；文件的 mtime 或大小变化后缓存自动失效
+    path, reader = SOURCES[name]
+    columns = tuple(columns) if columns is not None else None
+    key = (name, columns, season)
+    depends = PARTITION_DEPENDS.get(name, []) if season is not None else []
+    signature = (file_signature(path),) + tuple(file_signature(file) for file in depends)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with instrument.stage(f'load:{name if season is None else partition_name(name, season)}'):
+            if season is not None:
+                df = snapshot.read(partition_name(name, season), path, columns, version=snapshot_version(name),
+                                   depends=depends)
+                if df is None:
+                    full = _load_base(name)
+                    df = full[(SEASON_PARTITIONS[name](full) == season).to_numpy(bool)].reset_index(drop=True)
+                    if columns is not None:
+                        df = df[list(columns)]
+            else:
+                df = snapshot.read(name, path, columns, version=snapshot_version(name))
+            if df is None:
+                if columns is None:
+                    df = reader(path)
+                    if name in AUTO_SNAPSHOT_SOURCES:
+                        _save_snapshot(name, path, df)
+                else:
+                    df = _load_base(name)[list(columns)]
+        _cache[key] = (signature, df)
+        return df
+
+
+# 可以追加新一届数据的数据源 -> input/editions/ 下的子目录（由 ingest.py 写入，只追加、不修改）
+EDITIONS_DIR = os.path.join(INPUT_DIR, 'editions')
+APPENDABLE_SOURCES = {
+    'medals': os.path.join(EDITIONS_DIR, 'medals'),
+    'hosts': os.path.join(EDITIONS_DIR, 'hosts'),
+}
+# 追加后的数据：{(数据源, 列, 季节): (原始数据, 已合并的分区签名, 合并结果)}
+_appended = {}
+
+
+def edition_files(name):
+    # 按文件名排序的分区文件，即追加的先后顺序
+    directory = APPENDABLE_SOURCES.get(name)
+    if directory is None or not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, file) for file in sorted(os.listdir(directory)) if file.endswith('.csv')]
+
+
+def read_editions(name, files, columns=None, season=None):
+    reader = SOURCES[name][1]
+    df = pd.concat([reader(file) for file in files], ignore_index=True)
+    if season is not None:
+        df = df[(SEASON_PARTITIONS[name](df) == season).to_numpy(bool)].reset_index(drop=True)
+    return df if columns is None else df[list(columns)]
+
+
+def append_rows(df, rows):
+    """把 rows 接到 df 之后，保持列类型：category 列的类别在原有基础上追加新出现的值。"""
+    rows = rows[list(df.columns)]
+    parts = [df, rows]
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            new = pd.Index(rows[column].dropna().unique()).difference(dtype.categories)
+            dtype = pd.CategoricalDtype(dtype.categories.append(new.astype(dtype.categories.dtype)), ordered=dtype.ordered)
+        parts = [part.assign(**{column: part[column].astype(dtype)}) if part[column].dtype != dtype else part for part in parts]
+    return pd.concat(parts, ignore_index=True)
+
+
+def source_signature(name):
+    # 数据源原始文件、追加分区及季节分区所依赖文件的签名，publish_shared.py 发布时记录，用于判断共享的表是否过期
+    files = [SOURCES[name][0]] + edition_files(name) + PARTITION_DEPENDS.get(name, [])
+    return repr([(file.replace(os.sep, '/'), file_signature(file)) for file in files])
+
+
+# 发布到共享内存的数据源（见 publish_shared.py）；按季节分区的同时发布各季节的分区
+# Athletes.xlsx 只有运动员搜索用到，且几乎全是字符串列，不共享
+SHARED_SOURCES = ['hosts', 'medals', 'gdp', 'olympic_medals', 'noc_regions', 'population']
+# 已映射的共享表：{(数据源, 列, 季节): (发布版本, DataFrame)}
+_shared = {}
+
+
+def _load_shared(name, columns, season):
+    # 共享模式下返回映射自共享内存的只读表；未启用、未发布或发布的数据已过期时返回 None
+    root = shared_data.directory()
+    if root is None:
+        return None
+    manifest = shared_data.load_manifest(root)
+    table = name if season is None else partition_name(name, season)
+    entry = manifest['tables'].get(table) if manifest is not None else None
+    if entry is None or entry['signature'] != source_signature(name):
+        return None
+    key = (name, columns, season)
+    cached = _shared.get(key)
+    if cached is not None and cached[0] == manifest['version']:
+        return cached[1]
+    with _lock:
+        cached = _shared.get(key)
+        if cached is not None and cached[0] == manifest['version']:
+            return cached[1]
+        with instrument.stage(f'attach:{table}'):
+            df = shared_data.attach(root, manifest, table, columns)
+        if df is None:
+            return None
+        _shared[key] = (manifest['version'], df)
+        return df
+
+
+def load(name, columns=None, season=None):
+    """读取数据源；共享模式下优先映射 publish_shared.py 发布的表，否则在进程内加载（见 load_local）。"""
+    columns = tuple(columns) if columns is not None else None
+    if name in SHARED_SOURCES:
+        df = _load_shared(name, columns, season)
+        if df is not None:
+            return df
+    return load_local(name, columns, season)
+
+
+def load_local(name, columns=None, season=None):
+    """在本进程中读取数据源；有追加的新一届分区时接在原始数据之后返回。
+
+    新分区只读取一次并接到上一次的合并结果后面，新旧结果的关系记入 record_append，
+    由此构建的派生结构可以只处理新增的行。
+    """
+    base = _load_base(name, columns, season)
+    files = edition_files(name)
+    if not files:
+        return base
+    columns = tuple(columns) if columns is not None else None
+    key = (name, columns, season)
+    signature = tuple((file, file_signature(file)) for file in files)
+    entry = _appended.get(key)
+    if entry is not None and entry[0] is base and entry[1] == signature:
+        return entry[2]
+    with _lock:
+        entry = _appended.get(key)
+        if entry is not None and entry[0] is base and entry[1] == signature:
+            return entry[2]
+        if entry is not None and entry[0] is base and signature[:len(entry[1])] == entry[1]:
+            # 之前合并过的分区没有变化，只读取新增的分区
+            previous, files = entry[2], files[len(entry[1]):]
+        else:
+            previous = base
+        with instrument.stage(f'load:{name}.editions'):
+            rows = read_editions(name, files, columns, season)
+            if rows.empty:
+                df = previous
+            else:
+                df = append_rows(previous, rows)
+                # 增量取合并后的末尾几行，列类型与合并结果一致
+                record_append(df, previous, df.iloc[len(previous):])
+        _appended[key] = (base, signature, df)
+        return df
+
+
+# 返回的 DataFrame 在所有会话间共享，调用方不要原地修改
+def load_hosts(columns=None, season=None):
+    return load('hosts', columns, season)
+
+
+def load_medals(columns=None):
+    return load('medals', columns)
+
+
+def load_gdp(columns=None):
+    return load('gdp', columns)
+
+
+def load_olympic_medals(columns=None, season=None):
+    return load('olympic_medals', columns, season)
+
+
+def load_noc_regions(columns=None):
+    return load('noc_regions', columns)
+
+
+def load_population(columns=None):
+    return load('population', columns)
+
+
+def load_athletes(columns=None):
+    return load('athletes', columns)
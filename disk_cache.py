@@ -0,0 +1,188 @@
+"""部署时预先构建的图表与表格 HTML（由 warmup.py 写入），应用启动时读入。
+
+缓存按数据版本分目录（cache/<版本>/<页面>/）：版本由 input/ 下各数据源（含追加的新一届分区）
+以及程序代码的 mtime、大小得出，任何一项变化后旧目录自动不再使用，不会读到过期的图。
+每个页面目录下有若干分片：<分片>.bin 为依次写入的 encode() 后的字节，<分片>.idx 为 pickle 的
+{键: (偏移, 长度)}。启动时只把索引读入内存，某个键第一次被用到时才从 .bin 中读出并反序列化，
+结果保留在按页面划分的 LRU 中；各进程私有的只有索引和这些 LRU，文件内容由操作系统的页缓存共享。
+应用只读取缓存，不写入；缓存里没有的照常现场构建。
+"""
+import glob
+import hashlib
+import os
+import pickle
+import threading
+
+import athlete_events
+import data_loader
+
+CACHE_DIR = 'cache'
+# 缓存内容的格式变化时修改，旧缓存随之失效
+FORMAT_VERSION = 2
+# 每个页面保留的已反序列化对象数
+DECODED_SLOTS = 256
+
+_code_signature = None
+_store = None
+_lock = threading.Lock()
+
+
+def _signatures(paths):
+    signatures = []
+    for path in paths:
+        try:
+            signatures.append((path, data_loader.file_signature(path)))
+        except FileNotFoundError:
+            signatures.append((path, None))
+    return signatures
+
+
+def _code_files():
+    # 程序代码在进程运行期间不变，只计算一次
+    root = os.path.dirname(os.path.abspath(__file__))
+    return sorted(glob.glob(os.path.join(root, '*.py')) + glob.glob(os.path.join(root, 'views', '*.py')))
+
+
+def data_version():
+    """当前数据与代码对应的缓存版本（十六进制字符串）。"""
+    global _code_signature
+    if _code_signature is None:
+        _code_signature = repr(_signatures(_code_files()))
+    sources = [path for path, reader in data_loader.SOURCES.values()] + [athlete_events.ATHLETE_EVENTS_FILE]
+    for name in data_loader.APPENDABLE_SOURCES:
+        sources.extend(data_loader.edition_files(name))
+    digest = hashlib.sha1(f'{FORMAT_VERSION}|{_code_signature}|{_signatures(sources)!r}'.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def version_dir(cache_dir=CACHE_DIR, version=None):
+    return os.path.join(cache_dir, version or data_version())
+
+
+class Store:
+    """某个数据版本的缓存目录。"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._index = {}
+        self._listing = {}
+        self._decoded = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self, namespace):
+        # 读入该页面尚未读过的分片索引：{键: (.bin 文件, 偏移, 长度)}；
+        # warmup.py 在应用运行期间写入的新分片也能在下一次未命中时读到
+        directory = os.path.join(self.directory, namespace)
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return self._index.setdefault(namespace, {})
+        seen, known_mtime = self._listing.get(namespace, (set(), None))
+        index = self._index.setdefault(namespace, {})
+        if mtime == known_mtime:
+            return index
+        for file in sorted(os.listdir(directory)):
+            if file.endswith('.idx') and file not in seen:
+                path = os.path.join(directory, file)
+                with open(path, 'rb') as f:
+                    entries = pickle.load(f)
+                data_file = path[:-len('.idx')] + '.bin'
+                index.update((key, (data_file, offset, length)) for key, (offset, length) in entries.items())
+                seen.add(file)
+        self._listing[namespace] = (seen, mtime)
+        return index
+
+    def load(self, namespaces):
+        with self._lock:
+            for namespace in namespaces:
+                self._refresh(namespace)
+
+    def keys(self, namespace):
+        with self._lock:
+            return set(self._refresh(namespace))
+
+    def get(self, namespace, key, builder):
+        """已反序列化的对象 -> 缓存中的字节 -> builder() 现场构建。"""
+        decoded = self._decoded.get(namespace)
+        if decoded is None:
+            decoded = self._decoded.setdefault(namespace, data_loader.LRUCache(DECODED_SLOTS))
+        return decoded.get(key, lambda: self._decode(namespace, key, builder))
+
+    def _decode(self, namespace, key, builder):
+        index = self._index.get(namespace, {})
+        if key not in index:
+            with self._lock:
+                index = self._refresh(namespace)
+        location = index.get(key)
+        if location is None:
+            return builder()
+        data_file, offset, length = location
+        try:
+            with open(data_file, 'rb') as f:
+                f.seek(offset)
+                data = f.read(length)
+        except FileNotFoundError:  # 缓存目录已被删除（例如 warmup.py --prune），照常现场构建
+            return builder()
+        return decode(data)
+
+
+def current():
+    """当前数据版本的缓存，每个进程读入一次；数据或代码变化后换成新版本的目录。"""
+    global _store
+    directory = version_dir()
+    store = _store
+    if store is None or store.directory != directory:
+        with _lock:
+            if _store is None or _store.directory != directory:
+                _store = Store(directory)
+                if os.path.isdir(directory):
+                    _store.load(os.listdir(directory))
+            store = _store
+    return store
+
+
+def get(namespace, key, builder):
+    return current().get(namespace, key, builder)
+
+
+def encode(value):
+    # Plotly 图保存为 dict：直接 pickle 图对象时，读取时会重新逐项校验，比重新构建省不了多少
+    if type(value).__module__.startswith('plotly.'):
+        return pickle.dumps(('figure', value.to_dict()), protocol=pickle.HIGHEST_PROTOCOL)
+    return pickle.dumps(('object', value), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(data):
+    kind, value = pickle.loads(data)
+    if kind == 'figure':
+        import plotly.graph_objects as go
+        # 内容在写入前已由 Plotly 校验过，跳过构造时的校验
+        return go.Figure(value, _validate=False)
+    return value
+
+
+def write_shard(directory, namespace, name, entries):
+    """把 {键: 对象} 写成一个分片，返回写入的字节数。
+
+    先写 .bin 再写 .idx，都是先写临时文件再改名；读取方只从 .idx 发现分片，不会读到写了一半的数据。
+    """
+    path = os.path.join(directory, namespace, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    index = {}
+    with open(path + '.bin.tmp', 'wb') as f:
+        for key, value in entries.items():
+            data = encode(value)
+            index[key] = (f.tell(), len(data))
+            f.write(data)
+    os.replace(path + '.bin.tmp', path + '.bin')
+    with open(path + '.idx.tmp', 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.idx.tmp', path + '.idx')
+    return os.path.getsize(path + '.bin') + os.path.getsize(path + '.idx')
+
+
+def clear():
+    """丢弃本进程已读入的索引和反序列化结果，下一次使用时重新读取（基准测试的冷启动用）。"""
+    global _store
+    with _lock:
+        _store = None
@@ -0,0 +1,172 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import countries
+import data_loader
+
+MEDAL_TYPES = ['GOLD', 'SILVER', 'BRONZE']
+# 团体项目每名队员各占一行，按这些列去重后每块奖牌只算一次
+TEAM_MEDAL_KEY = ['slug_game', 'discipline_title', 'event_title', 'event_gender', 'medal_type', 'country_3_letter_code']
+READ_COLUMNS = TEAM_MEDAL_KEY + ['participant_type']
+
+
+class EventMedals:
+    """olympic_medals.csv 的赛事级奖牌表，每块奖牌一行。
+
+    medals 的各列均为整数或 category 编码：Game 为 games 表的行号，
+    Country_ID 来自 countries.CountryIndex，Is_Host 表示该国是否为该届东道主。
+    查询先用编码比较得到布尔掩码，再做一次 groupby。
+    """
+
+    def __init__(self, olympic_medals_df, hosts_df, index):
+        raw = olympic_medals_df[READ_COLUMNS]
+        team = raw['participant_type'] == 'GameTeam'
+        medals = pd.concat([raw[~team], raw[team].drop_duplicates(TEAM_MEDAL_KEY)]).sort_index()
+
+        # 与主办信息按 slug_game 连接，每届奥运会一行
+        self.games = hosts_df[['game_slug', 'game_name', 'game_location', 'game_season', 'game_year']].reset_index(drop=True)
+        self.games['Host_ID'] = index.ids_for_names(self.games['game_location'])
+        game = pd.Index(self.games['game_slug']).get_indexer(medals['slug_game'].astype(str))
+        if (game < 0).any():
+            raise ValueError('olympic_medals.csv references games missing from olympic_hosts.csv')
+
+        self.medals = pd.DataFrame({
+            'Game': game.astype('int16'),
+            'Year': self.games['game_year'].to_numpy()[game],
+            'Season': pd.Categorical.from_codes(self.games['game_season'].cat.codes.to_numpy()[game],
+                                                self.games['game_season'].cat.categories),
+            'Discipline': medals['discipline_title'].cat.remove_unused_categories().array,
+            'Event': medals['event_title'].cat.remove_unused_categories().array,
+            'Gender': medals['event_gender'].cat.remove_unused_categories().array,
+            'Medal': pd.Categorical(medals['medal_type'], categories=MEDAL_TYPES, ordered=True),
+            'Participant': medals['participant_type'].cat.remove_unused_categories().array,
+            'Country_ID': index.ids_for_codes(medals['country_3_letter_code']).array,
+        })
+        host_ids = self.games['Host_ID'].array[game]
+        self.medals['Is_Host'] = (host_ids == self.medals['Country_ID'].array).to_numpy(dtype=bool, na_value=False)
+        self._names = index.table['Name']
+        self._index = index
+
+    def with_games(self, hosts_rows):
+        # 主办信息追加了新一届、赛事奖牌表没有变化时：games 末尾接上新的届，原有的 Game 编号不变
+        engine = EventMedals.__new__(EventMedals)
+        engine.__dict__.update(self.__dict__)
+        games = hosts_rows[['game_slug', 'game_name', 'game_location', 'game_season', 'game_year']]
+        games = games.assign(Host_ID=self._index.ids_for_names(games['game_location']).array)
+        engine.games = data_loader.append_rows(self.games, games)
+        return engine
+
+    def _select(self, season=None, country=None, discipline=None, medal=None):
+        mask = np.ones(len(self.medals), dtype=bool)
+        if season is not None:
+            mask &= (self.medals['Season'] == season).to_numpy()
+        if country is not None:
+            country_id = self._index.id_for_name(country)
+            mask &= self.medals['Country_ID'].eq(country_id).fillna(False).to_numpy(bool)
+        if discipline is not None:
+            mask &= (self.medals['Discipline'] == discipline).to_numpy()
+        if medal is not None:
+            mask &= (self.medals['Medal'] == medal).to_numpy()
+        return self.medals[mask]
+
+    def discipline_dominance(self, season=None, medal=None, top=3):
+        # 每个项目中奖牌最多的国家及其占该项目奖牌的比例
+        medals = self._select(season=season, medal=medal)
+        counts = medals.groupby(['Discipline', 'Country_ID'], observed=True).size().rename('Medals').reset_index()
+        counts['Share'] = counts['Medals'] / counts.groupby('Discipline', observed=True)['Medals'].transform('sum')
+        counts = counts.sort_values(['Discipline', 'Medals'], ascending=[True, False], kind='stable')
+        leaders = counts.groupby('Discipline', observed=True).head(top).reset_index(drop=True)
+        leaders.insert(1, 'Country', leaders['Country_ID'].map(self._names).to_numpy())
+        return leaders
+
+    def gender_split(self, season=None, country=None):
+        # 每年各性别组别（Men / Women / Mixed / Open）的奖牌数
+        medals = self._select(season=season, country=country)
+        return medals.groupby(['Year', 'Gender'], observed=True).size().unstack('Gender', fill_value=0)
+
+    def team_share(self, season=None, country=None):
+        # 每年个人项目与团体项目的奖牌数及团体奖牌所占比例
+        medals = self._select(season=season, country=country)
+        table = medals.groupby(['Year', 'Participant'], observed=True).size().unstack('Participant', fill_value=0)
+        table = table.reindex(columns=['Athlete', 'GameTeam'], fill_value=0)
+        table['Team_Share'] = table['GameTeam'] / (table['Athlete'] + table['GameTeam'])
+        return table
+
+    def country_year_table(self):
+        # 每个国家每届的金银铜牌数，列与 data_loader.MEDAL_TABLE_COLUMNS 一致，可直接用于 MedalCube 等
+        table = self.medals.groupby(['Year', 'Country_ID', 'Medal'], observed=True).size().unstack('Medal', fill_value=0)
+        table = table.reindex(columns=MEDAL_TYPES, fill_value=0).astype('int32')
+        table.columns = ['Gold', 'Silver', 'Bronze']
+        table = table.reset_index()
+        table['Total'] = table['Gold'] + table['Silver'] + table['Bronze']
+        table['Country_Name'] = table['Country_ID'].map(self._names).astype('category')
+        return table[data_loader.MEDAL_TABLE_COLUMNS]
+
+    def medal_table(self, game_slug):
+        # 某一届按国家汇总的金银铜牌数
+        game = int(pd.Index(self.games['game_slug']).get_loc(game_slug))
+        medals = self.medals[self.medals['Game'].to_numpy() == game]
+        table = medals.groupby(['Country_ID', 'Medal'], observed=True).size().unstack('Medal', fill_value=0)
+        table = table.reindex(columns=MEDAL_TYPES, fill_value=0)
+        table.insert(0, 'Country', table.index.map(self._names))
+        return table.sort_values(MEDAL_TYPES, ascending=False)
+
+
+def _extend_event_medals(engine, frames, deltas):
+    medals_delta, hosts_delta, index_delta = deltas
+    if medals_delta is not None or index_delta is not None:
+        return None
+    # 增量为新增的届
+    return engine.with_games(hosts_delta), hosts_delta
+
+
+def get_event_medals(season=None):
+    # 指定季节时只读取该季节的分区
+    olympic_medals_df = data_loader.load_olympic_medals(columns=READ_COLUMNS, season=season)
+    hosts_df = data_loader.load_hosts(season=season)
+    return data_loader.cached_derived('event_medals', EventMedals, olympic_medals_df, hosts_df, countries.get_index(),
+                                      extend=_extend_event_medals)
+
+
+def load_medal_table(season='Summer'):
+    # 夏季沿用 Country_Medals.csv；冬季没有国家奖牌表，由赛事级奖牌汇总得到
+    if season == 'Summer':
+        return data_loader.load_medals(columns=data_loader.MEDAL_TABLE_COLUMNS)
+    engine = get_event_medals(season)
+    # 只新增了没有奖牌记录的届时奖牌表不变
+    return data_loader.cached_derived('season_medal_table', EventMedals.country_year_table, engine,
+                                      extend=lambda table, frames, deltas: (table, None))
+
+
+def benchmark(repeat=20):
+    # 各查询的中位耗时（毫秒），构建时间单独统计
+    start = time.perf_counter()
+    engine = get_event_medals()
+    results = {'build': (time.perf_counter() - start) * 1000}
+    queries = {
+        'discipline_dominance': lambda: engine.discipline_dominance(),
+        'discipline_dominance(Summer, GOLD)': lambda: engine.discipline_dominance(season='Summer', medal='GOLD'),
+        'gender_split': lambda: engine.gender_split(),
+        'gender_split(China)': lambda: engine.gender_split(country='China'),
+        'team_share(Winter)': lambda: engine.team_share(season='Winter'),
+        'medal_table(tokyo-2020)': lambda: engine.medal_table('tokyo-2020'),
+    }
+    for name, query in queries.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = float(np.median(timings))
+    return results
+
+
+if __name__ == '__main__':
+    # python event_medals.py：打印构建与各查询耗时，查询超过 50 ms 时返回非零
+    results = benchmark()
+    for name, ms in results.items():
+        print(f'{name:<40} {ms:8.2f} ms')
+    sys.exit(int(any(ms > 50 for name, ms in results.items() if name != 'build')))
@@ -0,0 +1,103 @@
+import pandas as pd
+
+import data_loader
+
+COUNT_COLUMN = 'Gold Medals'
+
+
+def _frame(series):
+    return series.rename(COUNT_COLUMN).reset_index()
+
+
+def _empty(*key_columns):
+    columns = {column: pd.Series(dtype=object) for column in key_columns}
+    columns[COUNT_COLUMN] = pd.Series(dtype='int64')
+    return pd.DataFrame(columns)
+
+
+class GoldIndex:
+    """去重金牌表上的查找索引。
+
+    构建时按 (Year, Sport, Team) 统计一次金牌数，再拆成以
+    (项目, 年份)、年份、(代表队, 年份) 为键的字典，
+    页面上的柱状图和桑基图只做字典查找，不再扫描整张金牌表。
+    """
+
+    def __init__(self, gold):
+        self.gold = gold
+        counts = gold.groupby(['Year', 'Sport', 'Team'], observed=True).size()
+        self.counts = counts
+
+        self.years = sorted((int(year) for year in counts.index.get_level_values('Year').unique()), reverse=True)
+
+        # (项目, 年份) -> 各代表队金牌数（按代表队名排列）
+        self._sport_year = {
+            (sport, int(year)): _frame(s.droplevel(['Year', 'Sport']))
+            for (year, sport), s in counts.groupby(level=['Year', 'Sport'], observed=True)
+        }
+
+        # 年份 -> 各代表队金牌数，以及按金牌数排好序的版本
+        by_year_team = counts.groupby(level=['Year', 'Team'], observed=True).sum()
+        self._year = {}
+        self._year_sorted = {}
+        for year, s in by_year_team.groupby(level='Year', observed=True):
+            table = _frame(s.droplevel('Year'))
+            self._year[int(year)] = table
+            self._year_sorted[int(year)] = table.sort_values(by=COUNT_COLUMN, ascending=False)
+
+        # (代表队, 年份) -> 各项目金牌数（Team, Sport, Gold Medals），以及对应的金牌明细行
+        self._team_year = {
+            (team, int(year)): _frame(s.droplevel('Year'))
+            for (year, team), s in counts.swaplevel('Sport', 'Team').groupby(level=['Year', 'Team'], observed=True)
+        }
+        self._year_rows = {int(year): rows for year, rows in gold.groupby('Year', observed=True)}
+        self._team_year_rows = {
+            (team, int(year)): rows
+            for (year, team), rows in gold.groupby(['Year', 'Team'], observed=True)
+        }
+
+    def teams_for_sport(self, sport, year):
+        # 某项目某年各代表队的金牌数
+        table = self._sport_year.get((sport, year))
+        if table is None:
+            return _empty('Team')
+        return table
+
+    def teams_for_year(self, year):
+        # 某年各代表队的金牌总数
+        table = self._year.get(year)
+        if table is None:
+            return _empty('Team')
+        return table
+
+    def top_teams(self, year, n=20):
+        # 某年金牌数最多的 n 个代表队
+        table = self._year_sorted.get(year)
+        if table is None:
+            return _empty('Team')
+        return table.head(n)
+
+    def sports_for_team(self, team, year):
+        # 某代表队某年在各项目上的金牌数
+        table = self._team_year.get((team, year))
+        if table is None:
+            return _empty('Team', 'Sport')
+        return table
+
+    def rows_for_year(self, year):
+        # 某年的全部金牌明细（Year, Event, Team, Sport）
+        rows = self._year_rows.get(year)
+        if rows is None:
+            return self.gold.iloc[:0]
+        return rows
+
+    def rows_for_team(self, team, year):
+        # 某代表队某年的金牌明细（Year, Event, Team, Sport）
+        rows = self._team_year_rows.get((team, year))
+        if rows is None:
+            return self.gold.iloc[:0]
+        return rows
+
+
+def get_gold_index(gold):
+    return data_loader.cached_derived('gold_index', GoldIndex, gold)
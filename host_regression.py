@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+import countries
+import data_loader
+
+MEDAL_TYPES = ['Gold', 'Silver', 'Bronze', 'Total']
+
+
+def country_years(medals_df, hosts_df, index, season=None):
+    """每个国家每届的奖牌数及是否为东道主（Is_Host 为 0/1）。
+
+    主办国与奖牌表的国家名写法不同（如 USSR / Soviet Union），统一成 Country_ID 后再比较。
+    hosts_df 已按季节分区时 season 留空即可。
+    """
+    yearly = medals_df.groupby(['Country_Name', 'Year'], observed=True)[MEDAL_TYPES].sum().reset_index()
+    hosts = hosts_df if season is None else hosts_df[hosts_df['game_season'] == season]
+    host_ids = index.ids_for_names(hosts['game_location']).fillna(-1)
+    year_ids = index.ids_for_names(yearly['Country_Name']).fillna(-2)
+    host_keys = pd.MultiIndex.from_arrays([host_ids.to_numpy('int32'), hosts['game_year'].astype(int)])
+    year_keys = pd.MultiIndex.from_arrays([year_ids.to_numpy('int32'), yearly['Year'].astype(int)])
+    yearly['Is_Host'] = year_keys.isin(host_keys).astype(int)
+    return yearly
+
+
+def group_stats(yearly):
+    # 每个国家、每种奖牌按是否东道主分组的行数 n、和 s、平方和 ss；可以逐届相加
+    long = yearly.melt(id_vars=['Country_Name', 'Year', 'Is_Host'], value_vars=MEDAL_TYPES,
+                       var_name='Medal', value_name='Y')
+    long['Country_Name'] = long['Country_Name'].astype(str)
+    long['Y'] = long['Y'].astype('float64')
+    long['Y2'] = long['Y'] ** 2
+
+    groups = long.groupby(['Country_Name', 'Medal', 'Is_Host'], observed=True).agg(n=('Y', 'size'), s=('Y', 'sum'), ss=('Y2', 'sum'))
+    groups = groups.unstack('Is_Host', fill_value=0)
+    return groups.reindex(columns=pd.MultiIndex.from_product([['n', 's', 'ss'], [0, 1]]), fill_value=0)
+
+
+def fit_all(yearly, groups=None):
+    """对每个国家、每种奖牌一次性拟合 Y = const + slope * Is_Host。
+
+    回归量只有一个 0/1 哑变量，最小二乘解就是分组均值：
+    截距为非东道主年份的均值，斜率为东道主与非东道主年份均值之差；
+    R² 与标准误由组内、总平方和直接算出，无需逐个拟合模型。
+    已有 group_stats() 的结果时直接传入 groups。
+    """
+    if groups is None:
+        groups = group_stats(yearly)
+    n0, n1 = groups[('n', 0)], groups[('n', 1)]
+    s0, s1 = groups[('s', 0)], groups[('s', 1)]
+    ss0, ss1 = groups[('ss', 0)], groups[('ss', 1)]
+
+    n = n0 + n1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean0 = s0 / n0
+        mean1 = s1 / n1
+        mean = (s0 + s1) / n
+        sst = (ss0 + ss1) - n * mean ** 2
+        # 组内平方和（残差平方和）
+        ssr = (ss0 - n0 * mean0 ** 2) + np.where(n1 > 0, ss1 - n1 * mean1 ** 2, 0)
+
+        has_host = (n1 > 0) & (n0 > 0)
+        intercept = np.where(n0 > 0, mean0, mean1)
+        slope = np.where(has_host, mean1 - mean0, 0.0)
+        r_squared = np.where(has_host, 1 - ssr / sst, 0.0)
+        r_squared = np.where(sst > 0, r_squared, np.nan)
+
+        sigma2 = ssr / (n - 2)
+        se_intercept = np.sqrt(sigma2 / n0)
+        se_slope = np.where(has_host, np.sqrt(sigma2 * (1 / n0 + 1 / n1)), np.nan)
+        t_slope = slope / se_slope
+
+    result = pd.DataFrame({
+        'n': n,
+        'n_host': n1,
+        'intercept': intercept,
+        'slope': slope,
+        'r_squared': r_squared,
+        'se_intercept': se_intercept,
+        'se_slope': se_slope,
+        't_slope': t_slope,
+    }, index=groups.index)
+    result = result.astype({'n': 'int64', 'n_host': 'int64'})
+    return result.reset_index()
+
+
+class HostRegression:
+    """所有国家、所有奖牌类型的东道主效应回归结果表。"""
+
+    def __init__(self, medals_df, hosts_df, index):
+        self.yearly = country_years(medals_df, hosts_df, index)
+        self._fit(group_stats(self.yearly))
+
+    def _fit(self, groups):
+        self._groups = groups
+        self.results = fit_all(self.yearly, groups)
+        self._index = self.results.set_index(['Country_Name', 'Medal']).sort_index()
+
+    def appended(self, medals_delta, hosts_delta, medals_df, hosts_df, index):
+        """追加新一届后的回归结果，返回 (新结果, 新增的 yearly 行)。
+
+        新增的每国每届汇总与分组统计量加到原有统计量上再求解，代价与国家数有关，与历史届数无关。
+        新的奖牌记录或主办信息涉及已有年份（会改变原有行的 Is_Host）时返回 None，需要完整重建。
+        """
+        known_years = set(self.yearly['Year'].unique().tolist())
+        if hosts_delta is not None and known_years.intersection(hosts_delta['game_year'].astype(int)):
+            return None
+        if medals_delta is None:
+            return self, None
+        if known_years.intersection(medals_delta['Year'].astype(int)):
+            return None
+        yearly = country_years(medals_delta, hosts_df, index)
+        regression = HostRegression.__new__(HostRegression)
+        regression.yearly = pd.concat([self.yearly, yearly], ignore_index=True)
+        regression._fit(self._groups.add(group_stats(yearly), fill_value=0))
+        return regression, yearly
+
+    def fit(self, country, medal_type):
+        # 某国家某种奖牌的回归结果（Series: intercept, slope, r_squared, ...）
+        return self._index.loc[(country, medal_type)]
+
+    def leaderboard(self, medal_type):
+        # 曾经主办过该季奥运会的国家，按东道主效应（斜率）降序
+        table = self.results[(self.results['Medal'] == medal_type) & (self.results['n_host'] > 0)]
+        return table.sort_values(by='slope', ascending=False).reset_index(drop=True)
+
+
+def _extend_regression(regression, frames, deltas):
+    medals_df, hosts_df, index = frames
+    medals_delta, hosts_delta, index_delta = deltas
+    if index_delta is not None:
+        return None
+    return regression.appended(medals_delta, hosts_delta, medals_df, hosts_df, index)
+
+
+def get_host_regression(medals_df, hosts_df):
+    return data_loader.cached_derived('host_regression', HostRegression, medals_df, hosts_df, countries.get_index(),
+                                      extend=_extend_regression)
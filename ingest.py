@@ -0,0 +1,168 @@
+"""追加新一届奥运会的数据，不改动 input/ 下的原始文件。
+
+用法: python ingest.py [--hosts 主办信息.csv] [--medals 奖牌表.csv] [--dry-run]
+
+--hosts 与 olympic_hosts.csv 格式相同，每行一届新的奥运会；
+--medals 与 Country_Medals.csv 格式相同（分号分隔），只能包含同一个比已有年份都晚的夏季奥运会年份。
+两者都先校验（列、数值、国家名、与已有数据是否重复），全部通过后才写入
+input/editions/<数据源>/ 下的新分区文件，已有的分区文件不会被覆盖或修改。
+
+运行中的应用下一次加载数据时只读取新分区并接在原有数据之后，
+依赖它的聚合表、时间序列、回归结果等在原结果上增量更新（见 data_loader.cached_derived），
+与新一届无关的缓存继续有效。
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+import countries
+import data_loader
+
+HOSTS_COLUMNS = list(data_loader.HOSTS_DTYPES)
+MEDALS_COLUMNS = list(data_loader.MEDALS_DTYPES)
+
+
+class EditionError(ValueError):
+    """新一届的数据没有通过校验，errors 为所有问题的列表。"""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _read(path, columns, delimiter=','):
+    # 先全部按字符串读入，数值在校验时再转换，出错时可以指出具体的行
+    df = pd.read_csv(path, delimiter=delimiter, dtype=str, keep_default_na=False)
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        raise EditionError([f'{path}: missing columns {", ".join(missing)}'])
+    return df[columns]
+
+
+def _integers(df, column, errors, minimum=None):
+    values = pd.to_numeric(df[column], errors='coerce')
+    bad = values.isna() | (values != values.round())
+    if minimum is not None:
+        bad |= values < minimum
+    for row in df.index[bad.to_numpy(bool)]:
+        errors.append(f'row {row + 2}: {column} must be an integer{f" >= {minimum}" if minimum is not None else ""}, got {df.at[row, column]!r}')
+    return values
+
+
+def validate_hosts(hosts):
+    errors = []
+    existing = data_loader.load_hosts(columns=['game_slug', 'game_season', 'game_year'])
+    years = _integers(hosts, 'game_year', errors, minimum=1896)
+    for row, (slug, season, name, location) in enumerate(zip(hosts['game_slug'], hosts['game_season'],
+                                                              hosts['game_name'], hosts['game_location'])):
+        if not slug or not name or not location:
+            errors.append(f'row {row + 2}: game_slug, game_name and game_location must not be empty')
+        if season not in data_loader.SEASONS:
+            errors.append(f'row {row + 2}: game_season must be one of {", ".join(data_loader.SEASONS)}, got {season!r}')
+    duplicated = hosts['game_slug'][hosts['game_slug'].duplicated()]
+    known = hosts['game_slug'][hosts['game_slug'].isin(existing['game_slug'].astype(str))]
+    for slug in pd.concat([duplicated, known]).unique():
+        errors.append(f'game {slug!r} already exists')
+    if not errors:
+        keys = pd.MultiIndex.from_arrays([existing['game_season'].astype(str), existing['game_year'].astype(int)])
+        for season, year in zip(hosts['game_season'], years.astype(int)):
+            if (season, year) in keys:
+                errors.append(f'{season} {year} already has a host')
+    if errors:
+        raise EditionError(errors)
+    return hosts
+
+
+def validate_medals(medals, hosts=None):
+    """校验一届的国家奖牌表，返回其年份；hosts 为同时追加的主办信息。"""
+    errors = []
+    years = _integers(medals, 'Year', errors)
+    for column in ['Gold', 'Silver', 'Bronze']:
+        _integers(medals, column, errors, minimum=0)
+    if errors:
+        raise EditionError(errors)
+    if years.nunique() != 1:
+        raise EditionError([f'all rows must belong to one edition, got years {sorted(years.unique().astype(int))}'])
+    year = int(years.iloc[0])
+
+    existing = data_loader.load_medals(columns=['Year'])
+    if year <= int(existing['Year'].max()):
+        errors.append(f'{year} is not newer than the latest edition in the medal table ({int(existing["Year"].max())}); '
+                      'only new editions can be appended')
+    names = medals['Country_Name']
+    if (names == '').any():
+        errors.append('Country_Name must not be empty')
+    for name in names[names.duplicated()].unique():
+        errors.append(f'{name!r} appears more than once')
+
+    # 国家名或代码至少有一个能在国家对照表中找到
+    index = countries.get_index()
+    ids = index.ids_for_names(names).fillna(index.ids_for_codes(medals['Country_Code'].mask(medals['Country_Code'] == '')))
+    for name in names[ids.isna().to_numpy(bool)]:
+        errors.append(f'unknown country {name!r}: neither the name nor the code matches an existing country')
+
+    # 这一届的主办信息要么已有，要么同时追加
+    summer_years = set(data_loader.load_hosts(columns=['game_year'], season='Summer')['game_year'].astype(int))
+    if hosts is not None:
+        summer_years |= set(hosts.loc[hosts['game_season'] == 'Summer', 'game_year'].astype(int))
+    if year not in summer_years:
+        errors.append(f'no Summer host for {year}: add it with --hosts')
+    if errors:
+        raise EditionError(errors)
+    return year
+
+
+def _write(name, label, df, delimiter=','):
+    # 文件名以序号开头，按文件名排序即追加顺序；先写临时文件再改名，读取方不会看到写了一半的分区
+    directory = data_loader.APPENDABLE_SOURCES[name]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{len(data_loader.edition_files(name)) + 1:04d}-{label}.csv')
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    tmp = path + '.tmp'
+    df.to_csv(tmp, sep=delimiter, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def ingest(hosts_file=None, medals_file=None, dry_run=False):
+    # 返回写入的分区文件；校验不通过时抛出 EditionError，不写入任何文件
+    hosts = validate_hosts(_read(hosts_file, HOSTS_COLUMNS)) if hosts_file else None
+    medals = _read(medals_file, MEDALS_COLUMNS, delimiter=';') if medals_file else None
+    year = validate_medals(medals, hosts) if medals is not None else None
+    if dry_run:
+        return []
+    written = []
+    # 先写主办信息：奖牌分区生效时对应的东道主已经存在
+    if hosts is not None:
+        written.append(_write('hosts', '-'.join(hosts['game_slug']), hosts))
+    if medals is not None:
+        written.append(_write('medals', str(year), medals, delimiter=';'))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Append a new Olympic Games edition as a new data partition.')
+    parser.add_argument('--hosts', help='new rows in the olympic_hosts.csv format')
+    parser.add_argument('--medals', help='one edition in the Country_Medals.csv format (semicolon-separated)')
+    parser.add_argument('--dry-run', action='store_true', help='only validate, do not write anything')
+    args = parser.parse_args(argv)
+    if not args.hosts and not args.medals:
+        parser.error('nothing to ingest: pass --hosts and/or --medals')
+    try:
+        written = ingest(args.hosts, args.medals, args.dry_run)
+    except EditionError as e:
+        for error in e.errors:
+            print(f'error: {error}', file=sys.stderr)
+        return 1
+    if args.dry_run:
+        print('validation passed, nothing written (--dry-run)')
+    for path in written:
+        print(f'wrote {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
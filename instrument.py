@@ -0,0 +1,163 @@
+"""按阶段记录一次运行（Streamlit 的一次 rerun）的耗时和内存分配，默认关闭。
+
+用 rerun() 开启记录后，同一线程中经过 stage() 的代码都会记一个阶段，阶段可以嵌套：
+data_loader 读取原始文件/快照记为 load:<数据源>，构建派生结构记为 aggregate:<名称>，
+页面中的表格渲染、图表构建和序列化由 views 标注。未开启时 stage() 只检查一次线程局部变量。
+
+每次运行结束后输出一条 JSON 结构化日志（logger "instrument"，设置环境变量
+OLYMPIC_INSTRUMENT_LOG 时同时追加到该文件）；设置 OLYMPIC_PROFILE_DIR 时
+整个运行另外用 cProfile 记录并写出 .prof 文件，可用 snakeviz / pstats 查看。
+"""
+import cProfile
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class Recorder:
+    """一次运行的阶段记录。
+
+    stages 按开始顺序排列，每项为 dict：name、depth、ms（含子阶段）、self_ms（不含子阶段）；
+    记录内存分配时另有 alloc_kb（阶段结束时净增）和 peak_kb（阶段内相对开始时的峰值）。
+    内存由 tracemalloc 统计，是进程级的，同时有多个会话运行时会互相计入。
+    """
+
+    def __init__(self, label='', track_allocations=False):
+        self.label = label
+        self.track_allocations = track_allocations
+        self.started = time.time()
+        self.stages = []
+        self.total_ms = None
+        self.profile_path = None
+        self._open = []
+
+    @contextmanager
+    def stage(self, name):
+        record = {'name': name, 'depth': len(self._open)}
+        self.stages.append(record)
+        if self.track_allocations:
+            if self._open:
+                # 子阶段会重置峰值，先把到目前为止的峰值记到外层
+                self._open[-1]['_peak'] = max(self._open[-1]['_peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            record['_start_memory'] = record['_peak'] = tracemalloc.get_traced_memory()[0]
+        record['_child_ms'] = 0.0
+        self._open.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['ms'] = (time.perf_counter() - start) * 1000
+            record['self_ms'] = record['ms'] - record.pop('_child_ms')
+            self._open.pop()
+            if self._open:
+                self._open[-1]['_child_ms'] += record['ms']
+            if self.track_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(record.pop('_peak'), peak)
+                start_memory = record.pop('_start_memory')
+                record['alloc_kb'] = (current - start_memory) / 1024
+                record['peak_kb'] = (peak - start_memory) / 1024
+                if self._open:
+                    self._open[-1]['_peak'] = max(self._open[-1]['_peak'], peak)
+                tracemalloc.reset_peak()
+
+    def to_record(self):
+        return {
+            'event': 'rerun',
+            'label': self.label,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'total_ms': round(self.total_ms, 2),
+            'profile': self.profile_path,
+            'stages': [{key: round(value, 2) if isinstance(value, float) else value for key, value in record.items()}
+                       for record in self.stages],
+        }
+
+
+def current():
+    return getattr(_local, 'recorder', None)
+
+
+@contextmanager
+def stage(name):
+    # 当前线程没有开启记录时不做任何事
+    recorder = current()
+    if recorder is None:
+        yield None
+        return
+    with recorder.stage(name) as record:
+        yield record
+
+
+def timed(name):
+    """装饰器：函数的每次调用记为一个阶段。"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_label(label):
+    recorder = current()
+    if recorder is not None:
+        recorder.label = label
+
+
+def _profile_path(profile_dir, recorder):
+    slug = re.sub(r'\W+', '-', recorder.label).strip('-').lower() or 'run'
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(recorder.started))
+    return os.path.join(profile_dir, f'{stamp}-{int(recorder.started * 1000) % 1000:03d}-{slug}.prof')
+
+
+def _emit(recorder):
+    line = json.dumps(recorder.to_record(), ensure_ascii=False)
+    logger.info(line)
+    log_file = os.environ.get('OLYMPIC_INSTRUMENT_LOG')
+    if log_file:
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+@contextmanager
+def rerun(label='', enabled=True, track_allocations=False):
+    """记录一次运行，返回 Recorder；enabled 为 False 时返回 None，开销为零。"""
+    if not enabled or current() is not None:
+        yield None
+        return
+    recorder = Recorder(label, track_allocations)
+    started_tracing = track_allocations and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profile_dir = os.environ.get('OLYMPIC_PROFILE_DIR')
+    profiler = cProfile.Profile() if profile_dir else None
+    _local.recorder = recorder
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield recorder
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        recorder.total_ms = (time.perf_counter() - start) * 1000
+        _local.recorder = None
+        if started_tracing:
+            tracemalloc.stop()
+        if profiler is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+            recorder.profile_path = _profile_path(profile_dir, recorder)
+            profiler.dump_stats(recorder.profile_path)
+        _emit(recorder)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+import data_loader
+
+MEDAL_TYPES = ['Gold', 'Silver', 'Bronze', 'Total']
+
+
+class MedalCube:
+    """按 (年份 × 国家 × 奖牌类型) 预先汇总的奖牌表。
+
+    每个年份的切片及其按各奖牌类型排好序的版本在构建时一次算好，
+    查询时只做字典查找。另外按届累加的前缀和（届数 + 1 × 国家 × 奖牌类型）
+    使任意年份区间的合计只需两行相减，代价为 O(国家数)。
+    """
+
+    def __init__(self, medals_df):
+        counts = medals_df.groupby(['Year', 'Country_Name'], observed=True)[['Gold', 'Silver', 'Bronze']].sum()
+        counts['Total'] = counts['Gold'] + counts['Silver'] + counts['Bronze']
+
+        # 每届奥运会内的名次（并列取最小名次）
+        for medal in MEDAL_TYPES:
+            counts[f'{medal}_Rank'] = counts.groupby(level='Year')[medal].rank(method='min', ascending=False).astype('int32')
+
+        self.counts = counts
+        self.years = sorted(int(year) for year in counts.index.get_level_values('Year').unique())
+        self._slices = {}
+        self._sorted = {}
+        for year, df_year in counts.groupby(level='Year'):
+            df_year = df_year.droplevel('Year')
+            self._slices[int(year)] = df_year
+            self._sorted[int(year)] = {medal: df_year.sort_values(by=medal, ascending=False) for medal in MEDAL_TYPES}
+
+        # 前缀和：第 i 行为前 i 届的累计奖牌数；games 为累计参赛（有记录的）届数
+        self.countries = pd.Index(sorted(counts.index.get_level_values('Country_Name').unique().astype(str)), name='Country_Name')
+        self._prefix, self._games = self._cumulate(counts, self.years, self.countries)
+
+    @staticmethod
+    def _cumulate(counts, years, countries):
+        year_pos = np.searchsorted(years, counts.index.get_level_values('Year'))
+        country_pos = countries.get_indexer(counts.index.get_level_values('Country_Name').astype(str))
+        prefix = np.zeros((len(years) + 1, len(countries), len(MEDAL_TYPES)), dtype='int32')
+        prefix[year_pos + 1, country_pos] = counts[MEDAL_TYPES].to_numpy('int32')
+        games = np.zeros((len(years) + 1, len(countries)), dtype='int16')
+        games[year_pos + 1, country_pos] = 1
+        return np.cumsum(prefix, axis=0, dtype='int32'), np.cumsum(games, axis=0, dtype='int16')
+
+    def appended(self, medals_df):
+        """追加新一届（比已有年份都晚）的奖牌记录后的汇总表，返回 (新汇总表, 新增年份的 counts)。
+
+        只汇总新增的行：已有年份的切片和排序结果直接沿用，前缀和在末尾接上新年份的累计值。
+        新增行涉及已有年份时返回 None，需要完整重建。
+        """
+        delta = MedalCube(medals_df)
+        if not delta.years or (self.years and delta.years[0] <= self.years[-1]):
+            return None
+        cube = MedalCube.__new__(MedalCube)
+        cube.counts = pd.concat([self.counts, delta.counts])
+        cube.years = self.years + delta.years
+        cube._slices = {**self._slices, **delta._slices}
+        cube._sorted = {**self._sorted, **delta._sorted}
+
+        # 出现新国家时前缀和按新的国家顺序展开，旧年份的值不变
+        cube.countries = self.countries.union(delta.countries)
+        old_pos = cube.countries.get_indexer(self.countries)
+        new_pos = cube.countries.get_indexer(delta.countries)
+        cube._prefix = np.zeros((len(cube.years) + 1, len(cube.countries), len(MEDAL_TYPES)), dtype='int32')
+        cube._games = np.zeros((len(cube.years) + 1, len(cube.countries)), dtype='int16')
+        cube._prefix[:len(self.years) + 1, old_pos] = self._prefix
+        cube._games[:len(self.years) + 1, old_pos] = self._games
+        cube._prefix[len(self.years) + 1:] = cube._prefix[len(self.years)]
+        cube._games[len(self.years) + 1:] = cube._games[len(self.years)]
+        cube._prefix[len(self.years) + 1:, new_pos] += delta._prefix[1:]
+        cube._games[len(self.years) + 1:, new_pos] += delta._games[1:]
+        return cube, delta.counts
+
+    def year_slice(self, year):
+        # 按国家名排列的某一年奖牌表
+        return self._slices[year]
+
+    def table(self, year, sort_by='Total'):
+        # 按指定奖牌类型降序排列的某一年奖牌表
+        return self._sorted[year][sort_by]
+
+    def range_table(self, start_year, end_year, sort_by='Total'):
+        """start_year 到 end_year（含）各届的合计奖牌表，按指定奖牌类型降序，并列时按国家名。
+
+        只包含区间内有记录的国家；Games 为区间内有记录的届数。
+        """
+        lo = np.searchsorted(self.years, start_year, side='left')
+        hi = max(np.searchsorted(self.years, end_year, side='right'), lo)  # 起始年份晚于结束年份时为空表
+        games = self._games[hi] - self._games[lo]
+        totals = self._prefix[hi] - self._prefix[lo]
+        present = games > 0
+        table = pd.DataFrame(totals[present], columns=MEDAL_TYPES, index=self.countries[present])
+        table['Games'] = games[present]
+        return table.sort_values(by=sort_by, ascending=False, kind='stable')
+
+    def rank_change(self, from_year, to_year, medal='Total'):
+        """两届之间各国按指定奖牌类型的名次变化，Change 为正表示名次上升；只包含两届都有记录的国家。"""
+        rank = f'{medal}_Rank'
+        table = pd.DataFrame({
+            'From_Rank': self._slices[from_year][rank],
+            'To_Rank': self._slices[to_year][rank],
+            f'From_{medal}': self._slices[from_year][medal],
+            f'To_{medal}': self._slices[to_year][medal],
+        }).dropna().astype('int32')
+        table['Change'] = table['From_Rank'] - table['To_Rank']
+        return table.sort_values(['Change', 'To_Rank'], ascending=[False, True])
+
+
+def get_cube(medals_df):
+    # 奖牌表追加了新一届时在原汇总表上接续，增量为新增年份的 counts
+    return data_loader.cached_derived('medal_cube', MedalCube, medals_df,
+                                      extend=lambda cube, frames, deltas: cube.appended(deltas[0]))
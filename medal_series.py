@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+import data_loader
+
+MEDAL_TYPES = ['Gold', 'Silver', 'Bronze', 'Total']
+
+
+class MedalSeries:
+    """每个国家按年份排好序的奖牌时间序列。
+
+    所有国家的数据存放在同一组连续数组中（years、medals 的每一行为一届，is_host 为东道主年份掩码），
+    按国家排序后每个国家占一段连续区间，查询时按国家名取出区间直接切片，
+    代价只与该国参加的届数有关，与奖牌表的大小无关。
+    """
+
+    def __init__(self, yearly):
+        # yearly 为 host_regression.country_years() 的结果：每个国家每届一行，带 Is_Host
+        yearly = yearly.assign(Country_Name=yearly['Country_Name'].astype(str)).sort_values(['Country_Name', 'Year'], kind='stable')
+        self.years = yearly['Year'].to_numpy('int16')
+        self.medals = yearly[MEDAL_TYPES].to_numpy('int32')
+        self.is_host = yearly['Is_Host'].to_numpy(bool)
+
+        names = yearly['Country_Name'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else np.array([], dtype=int)
+        stops = np.r_[starts[1:], len(names)]
+        self._spans = {name: slice(int(start), int(stop)) for name, start, stop in zip(names[starts], starts, stops)}
+
+    def appended(self, yearly):
+        """插入新一届各国的行（yearly 的年份都比已有年份晚）后的时间序列。
+
+        每行插到所属国家区间的末尾（新国家按名称顺序插入），区间按各国的行数重新累加，
+        不再对全部数据排序。
+        """
+        yearly = yearly.assign(Country_Name=yearly['Country_Name'].astype(str)).sort_values(['Country_Name', 'Year'], kind='stable')
+        names = yearly['Country_Name'].tolist()
+        countries = sorted(set(self._spans).union(names))
+        # 已有国家插到其区间末尾；新国家插到按名称排在它之后的第一个已有国家之前
+        insert_at = {}
+        following = len(self.years)
+        for country in reversed(countries):
+            span = self._spans.get(country)
+            if span is not None:
+                insert_at[country] = span.stop
+                following = span.start
+            else:
+                insert_at[country] = following
+        positions = [insert_at[name] for name in names]
+
+        series = MedalSeries.__new__(MedalSeries)
+        series.years = np.insert(self.years, positions, yearly['Year'].to_numpy('int16'))
+        series.medals = np.insert(self.medals, positions, yearly[MEDAL_TYPES].to_numpy('int32'), axis=0)
+        series.is_host = np.insert(self.is_host, positions, yearly['Is_Host'].to_numpy(bool))
+        added = pd.Series(names).value_counts()
+        lengths = [self._span(country).stop - self._span(country).start + int(added.get(country, 0)) for country in countries]
+        stops = np.cumsum(lengths)
+        series._spans = {country: slice(int(stop - length), int(stop)) for country, stop, length in zip(countries, stops, lengths)}
+        return series
+
+    @property
+    def countries(self):
+        return list(self._spans)
+
+    def _span(self, country):
+        # 没有奖牌记录的国家为空区间
+        return self._spans.get(country, slice(0, 0))
+
+    def frame(self, country):
+        # 某国家每届的金银铜牌数、总数及是否为东道主（0/1），按年份升序
+        span = self._span(country)
+        frame = pd.DataFrame(self.medals[span], columns=MEDAL_TYPES)
+        frame.insert(0, 'Year', self.years[span])
+        frame['Is_Host'] = self.is_host[span].astype(int)
+        return frame
+
+    def host_years(self, country):
+        # 该国作为东道主且有奖牌记录的年份
+        span = self._span(country)
+        return self.years[span][self.is_host[span]]
+
+
+def _extend_series(series, frames, deltas):
+    # 回归结果由追加新一届得到时，增量为新增的 yearly 行
+    return series.appended(deltas[0]), None
+
+
+def get_medal_series(regression):
+    # 与 host_regression.HostRegression 共用按国家、年份汇总的表，随其一起重建或接续
+    return data_loader.cached_derived('medal_series', lambda regression: MedalSeries(regression.yearly), regression,
+                                      extend=_extend_series)
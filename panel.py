@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+import countries
+import data_loader
+
+POPULATION_INDICATORS = ['Population', 'Density', 'Land_Area', 'Median_Age', 'Urban_Pop_Pct', 'World_Share_Pct']
+POPULATION_YEAR = 2020
+
+GDP_INDICATORS = ['GDP', 'GDP_WorldPercent']
+
+# 各国的 GDP 序列（Year, GDP, GDP_WorldPercent）；目前只有中国，新的国家加入这里即可
+GDP_LOADERS = {
+    'China': data_loader.load_gdp,
+}
+
+
+class EconomicPanel:
+    """国家 × 年份 × 指标 的面板数据。
+
+    values 为以 (Country, Year, Indicator) 为索引的长表，
+    wide 为以 (Country, Year) 为索引、每个指标一列的宽表。
+    """
+
+    def __init__(self, gdp_frames, population_df):
+        parts = []
+        for country, gdp_df in gdp_frames.items():
+            gdp_long = gdp_df.melt(id_vars='Year', value_vars=GDP_INDICATORS, var_name='Indicator', value_name='Value')
+            gdp_long.insert(0, 'Country', country)
+            parts.append(gdp_long)
+
+        population = population_df.assign(Country=population_df['Country'].astype(str))
+        population_long = population.melt(id_vars='Country', value_vars=POPULATION_INDICATORS, var_name='Indicator', value_name='Value')
+        population_long.insert(1, 'Year', POPULATION_YEAR)
+        parts.append(population_long)
+
+        long = pd.concat(parts, ignore_index=True)
+        long = long.astype({'Country': 'category', 'Year': 'int16', 'Indicator': 'category', 'Value': 'float64'})
+        self.values = long.set_index(['Country', 'Year', 'Indicator'])['Value'].sort_index()
+        self.wide = self.values.unstack('Indicator')
+
+    def countries_with(self, indicator):
+        # 有该指标数据的国家
+        column = self.wide[indicator].dropna()
+        return sorted(column.index.get_level_values('Country').unique())
+
+    def series(self, country, indicators):
+        # 某国家若干指标按年份的序列（DataFrame: Year + 指标列）
+        table = self.wide.xs(country, level='Country')[list(indicators)].dropna(how='all')
+        return table.reset_index()
+
+    def latest(self, indicator):
+        # 每个国家该指标最新一年的值
+        column = self.wide[indicator].dropna().reset_index()
+        return column.groupby('Country', observed=True)[indicator].last()
+
+
+def _build_panel(population_df, *gdp_frames):
+    return EconomicPanel(dict(zip(GDP_LOADERS, gdp_frames)), population_df)
+
+
+def medal_metrics(medals_df, panel, index):
+    """所有国家、所有年份的奖牌数与人均、单位 GDP 奖牌数，一次性向量化计算。
+
+    各数据源的国家名先统一成 Country_ID 再按整数连接；
+    人口只有 2020 年的数据，所有年份统一用它折算；
+    GDP 按同一年份对齐，没有 GDP 数据的国家和年份为空值。
+    """
+    yearly = medals_df.groupby(['Country_Name', 'Year'], observed=True)[['Gold', 'Silver', 'Bronze', 'Total']].sum().reset_index()
+    yearly = yearly.rename(columns={'Country_Name': 'Country'})
+    yearly['Country'] = yearly['Country'].astype(str)
+    yearly['Country_ID'] = index.ids_for_names(yearly['Country'])
+
+    population = panel.latest('Population')
+    population.index = index.ids_for_names(population.index)
+    population = population[population.index.notna()]
+    population = population[~population.index.duplicated()]
+    gdp = panel.wide['GDP'].dropna().reset_index()
+    gdp['Country_ID'] = index.ids_for_names(gdp['Country'])
+    gdp = gdp.dropna(subset=['Country_ID'])[['Country_ID', 'Year', 'GDP']]
+    gdp['Year'] = gdp['Year'].astype(yearly['Year'].dtype)
+
+    metrics = yearly.merge(gdp, on=['Country_ID', 'Year'], how='left')
+    metrics['Population'] = metrics['Country_ID'].map(population).astype('float64')
+
+    millions = metrics['Population'] / 1e6
+    metrics['Gold_per_Million'] = metrics['Gold'] / millions
+    metrics['Total_per_Million'] = metrics['Total'] / millions
+    # GDP 单位为万亿美元
+    metrics['Gold_per_Trillion_GDP'] = metrics['Gold'] / metrics['GDP']
+    metrics['Total_per_Trillion_GDP'] = metrics['Total'] / metrics['GDP']
+    metrics = metrics.replace([np.inf, -np.inf], np.nan)
+    metrics['Country'] = metrics['Country'].astype('category')
+    return metrics
+
+
+def get_panel():
+    gdp_frames = [load() for load in GDP_LOADERS.values()]
+    return data_loader.cached_derived('economic_panel', _build_panel, data_loader.load_population(), *gdp_frames)
+
+
+def _extend_metrics(metrics, frames, deltas):
+    # 奖牌表追加了新一届：只计算新增年份的指标，接在原结果之后
+    medals_delta, panel_delta, index_delta = deltas
+    if panel_delta is not None or index_delta is not None:
+        return None
+    if metrics['Year'].isin(medals_delta['Year'].unique()).any():
+        return None
+    added = medal_metrics(medals_delta, frames[1], frames[2])
+    return data_loader.append_rows(metrics, added), added
+
+
+def get_medal_metrics(medals_df):
+    panel = get_panel()
+    return data_loader.cached_derived('medal_metrics', medal_metrics, medals_df, panel, countries.get_index(),
+                                      extend=_extend_metrics)
@@ -0,0 +1,75 @@
+"""把 data_loader.SHARED_SOURCES 中的数据表发布到共享内存，同一台机器上的多个 Streamlit 工作进程只读共用一份。
+
+用法: python publish_shared.py [--dir /dev/shm/olympic-medals] [--watch 秒] [--force]
+
+在仓库根目录运行（与应用相同的工作目录），然后以 OLYMPIC_SHARED_DATA=<目录> 启动各工作进程。
+工作进程加载这些数据源时直接内存映射已发布的文件（见 shared_data），不再各自解析、各持一份；
+没有发布、或原始文件及追加的新一届分区在发布后发生变化时，自动回退到进程内加载。
+--watch 定期检查数据源，变化后（例如 ingest.py 追加了新一届）发布新版本，
+工作进程在下一次加载时切换到新版本；上一个版本保留，其余旧版本删除。
+只共享原始数据表，由它们构建的派生结构仍在每个工作进程中各有一份（见 shared_data）。
+"""
+import argparse
+import os
+import sys
+import time
+
+import data_loader
+import shared_data
+
+
+def _tables():
+    # {表名: (源数据签名, DataFrame)}；先取签名再读取，读取期间文件变化时发布的表会被视为过期
+    tables = {}
+    for name in data_loader.SHARED_SOURCES:
+        signature = data_loader.source_signature(name)
+        tables[name] = (signature, data_loader.load_local(name))
+        if name in data_loader.SEASON_PARTITIONS:
+            for season in data_loader.SEASONS:
+                tables[data_loader.partition_name(name, season)] = (signature, data_loader.load_local(name, season=season))
+    return tables
+
+
+def is_current(root=shared_data.DEFAULT_DIR):
+    manifest = shared_data.load_manifest(root)
+    if manifest is None:
+        return False
+    return all(name in manifest['tables'] and manifest['tables'][name]['signature'] == data_loader.source_signature(name)
+               for name in data_loader.SHARED_SOURCES)
+
+
+def publish(root=shared_data.DEFAULT_DIR, force=False):
+    """发布当前数据，返回新版本名；已发布的数据仍是最新时返回 None。"""
+    if not force and is_current(root):
+        return None
+    start = time.perf_counter()
+    os.makedirs(root, exist_ok=True)
+    previous = shared_data.load_manifest(root)
+    tables = _tables()
+    version = shared_data.write(root, tables)
+    keep = {version} | ({previous['version']} if previous is not None else set())
+    shared_data.prune(root, keep)
+    size = sum(df.memory_usage(index=False).sum() for _, df in tables.values())
+    print(f'published {version} to {root}: ' + ', '.join(f'{name} {len(df)} rows' for name, (_, df) in tables.items())
+          + f' (~{size / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s')
+    return version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Publish the shared source tables to shared memory for all app workers.')
+    parser.add_argument('--dir', default=shared_data.DEFAULT_DIR, help=f'publish directory (default: {shared_data.DEFAULT_DIR})')
+    parser.add_argument('--watch', type=float, metavar='SECONDS', help='keep running and republish when the sources change')
+    parser.add_argument('--force', action='store_true', help='publish even if the published data is up to date')
+    args = parser.parse_args(argv)
+
+    if publish(args.dir, args.force) is None:
+        print(f'{args.dir} is up to date')
+    print(f'start the app with {shared_data.ENV_VAR}={args.dir}')
+    while args.watch:
+        time.sleep(args.watch)
+        publish(args.dir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+import countries
+import data_loader
+
+# 每次搜索最多返回的运动员数
+MAX_RESULTS = 50
+
+
+class Roster:
+    """Athletes.xlsx 的运动员名册及按姓名前缀查找的索引。
+
+    athletes 中 Name 为字符串，Country / Discipline 为 category，Country_ID 来自 countries.CountryIndex。
+    姓名按空白拆成若干词（姓、名均可作为前缀的起点），所有词统一小写后排序，
+    前缀查找用两次二分定位区间，代价为 O(log n + 结果数)。
+    """
+
+    def __init__(self, athletes_df, index):
+        country_ids = index.ids_for_names(athletes_df['NOC'])
+        # 国家名统一成奖牌表的写法（如 People's Republic of China -> China）
+        country = country_ids.map(index.table['Name']).fillna(athletes_df['NOC'].astype(str))
+        self.athletes = pd.DataFrame({
+            'Name': athletes_df['Name'].astype('string'),
+            'Country': country.astype('category'),
+            'Discipline': athletes_df['Discipline'].astype('category'),
+            'Country_ID': country_ids.array,
+        })
+
+        # (小写的词, 所在行) 按词排序；整个姓名也作为一个词，支持 "abad n" 这样带空格的前缀
+        names = self.athletes['Name'].fillna('').str.casefold()
+        tokens = names.str.split().explode()
+        tokens = pd.concat([tokens, names]).dropna()
+        tokens = tokens[tokens != '']
+        order = np.argsort(tokens.to_numpy(dtype=object), kind='stable')
+        self._tokens = tokens.to_numpy(dtype=object)[order]
+        self._rows = tokens.index.to_numpy()[order]
+
+    def search(self, prefix, limit=MAX_RESULTS):
+        # 姓名中任一词以 prefix 开头的运动员，按姓名排序
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return self.athletes.iloc[:0]
+        lo = np.searchsorted(self._tokens, prefix, side='left')
+        hi = np.searchsorted(self._tokens, prefix + '\U0010ffff', side='left')
+        rows = pd.unique(self._rows[lo:hi])
+        return self.athletes.iloc[rows].sort_values('Name').head(limit)
+
+    def by_country(self, country):
+        # 某国家的全部运动员
+        country_id = countries.get_index().id_for_name(country)
+        return self.athletes[self.athletes['Country_ID'].eq(country_id).fillna(False).to_numpy(bool)]
+
+    def discipline_counts(self, country=None):
+        # 各项目的运动员人数，可限定国家
+        athletes = self.athletes if country is None else self.by_country(country)
+        return athletes.groupby('Discipline', observed=True).size().sort_values(ascending=False)
+
+
+def get_roster():
+    return data_loader.cached_derived('roster', Roster, data_loader.load_athletes(), countries.get_index())
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import plotly.colors
+
+
+def build_sankey(df, levels, value_column=None, colorscale='Blues'):
+    """用数组运算构建多层桑基图的节点和连线。
+
+    levels 为各层对应的列名，例如 ['Team', 'Sport'] 或 ['Team', 'Sport', 'Event']；
+    value_column 为空时每行计 1。相邻两层之间的每个组合生成一条连线，
+    连线颜色按数值归一化到 [0.3, 0.8] 后一次性从色阶中取样。
+    """
+    values = df[value_column] if value_column is not None else pd.Series(1, index=df.index)
+    paths = df[levels].assign(_value=values.to_numpy()).groupby(levels, observed=True)['_value'].sum().reset_index()
+
+    # 每层节点按首次出现顺序编号，层与层之间依次偏移
+    labels = []
+    node_level = []
+    codes = []
+    offset = 0
+    for level, column in enumerate(levels):
+        level_codes, uniques = pd.factorize(paths[column])
+        codes.append(level_codes + offset)
+        labels.extend(uniques)
+        node_level.extend([level] * len(uniques))
+        offset += len(uniques)
+
+    sources = []
+    targets = []
+    link_values = []
+    for level in range(len(levels) - 1):
+        links = pd.DataFrame({'source': codes[level], 'target': codes[level + 1], 'value': paths['_value'].to_numpy()})
+        links = links.groupby(['source', 'target'], sort=False)['value'].sum()
+        sources.append(links.index.get_level_values('source').to_numpy())
+        targets.append(links.index.get_level_values('target').to_numpy())
+        link_values.append(links.to_numpy())
+
+    sources = np.concatenate(sources) if sources else np.array([], dtype=int)
+    targets = np.concatenate(targets) if targets else np.array([], dtype=int)
+    link_values = np.concatenate(link_values) if link_values else np.array([], dtype=int)
+
+    if len(link_values) and link_values.max() != link_values.min():
+        color_values = 0.3 + 0.5 * (link_values - link_values.min()) / (link_values.max() - link_values.min())
+    else:
+        color_values = np.full(len(link_values), 0.5)
+    link_colors = plotly.colors.sample_colorscale(colorscale, color_values.tolist()) if len(link_values) else []
+
+    return {
+        'labels': labels,
+        'node_level': np.array(node_level, dtype=int),
+        'source': sources,
+        'target': targets,
+        'value': link_values,
+        'color': link_colors,
+    }
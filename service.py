@@ -0,0 +1,174 @@
+"""本地 HTTP/JSON 分析服务，所有请求共用进程内的一份数据。
+
+用法: python service.py [--host 127.0.0.1] [--port 8765] [--workers 8]
+
+GET /medal-table?year=2020&sort_by=Gold&season=Summer 等，参数见 ROUTES；
+结果为 JSON，DataFrame 按行输出为对象数组。
+请求由固定大小的线程池处理，启动时先加载数据，之后的请求不再读取文件。
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import api
+import data_loader
+import medal_cube
+
+logger = logging.getLogger(__name__)
+
+
+def _str_list(value):
+    # 逗号分隔的列表参数，如 metrics=GDP,Gold
+    return [item for item in value.split(',') if item]
+
+
+def _one_of(name, choices):
+    # 取值有限的参数：未知的值按参数错误返回 400，而不是得到空结果
+    def parse(value):
+        if value not in choices:
+            raise ValueError(f'{name} must be one of {", ".join(choices)}, got {value!r}')
+        return value
+    return parse
+
+
+_season = _one_of('season', data_loader.SEASONS)
+_medal = _one_of('medal', medal_cube.MEDAL_TYPES)
+_sort_by = _one_of('sort_by', medal_cube.MEDAL_TYPES)
+
+
+# 路径 -> (函数, {参数名: 类型转换})
+ROUTES = {
+    '/medal-years': (api.medal_years, {'season': _season}),
+    '/medal-table': (api.medal_table, {'year': int, 'sort_by': _sort_by, 'season': _season}),
+    '/medal-range-table': (api.medal_range_table, {'start_year': int, 'end_year': int, 'sort_by': _sort_by, 'season': _season}),
+    '/rank-change': (api.rank_change, {'from_year': int, 'to_year': int, 'medal': _medal, 'season': _season}),
+    '/country-medals': (api.country_medals, {'country': str, 'season': _season}),
+    '/country-series': (api.country_series, {'country': str, 'season': _season}),
+    '/host-advantage': (api.host_advantage, {'country': str, 'medal': _medal, 'season': _season}),
+    '/host-leaderboard': (api.host_leaderboard, {'medal': _medal, 'season': _season}),
+    '/economic-correlation': (api.economic_correlation, {'country': str, 'start_year': int, 'end_year': int, 'metrics': _str_list}),
+    '/economic-metrics': (api.economic_metrics, {'year': int}),
+    '/strong-events/teams': (api.strong_event_teams, {'sport': str, 'year': int, 'season': _season, 'top': int}),
+    '/strong-events/flows': (api.strong_event_flows, {'year': int, 'team': str, 'levels': _str_list, 'season': _season, 'top': int}),
+    '/discipline-dominance': (api.discipline_dominance, {'season': _season, 'medal': _medal, 'top': int}),
+    '/gender-split': (api.gender_split, {'season': _season, 'country': str}),
+    '/team-share': (api.team_share, {'season': _season, 'country': str}),
+    '/athletes': (api.search_athletes, {'prefix': str, 'limit': int}),
+}
+
+
+def to_json(result):
+    # DataFrame / Series 交给 pandas 序列化（处理 numpy 类型和缺失值），其余按普通 JSON
+    if isinstance(result, pd.DataFrame):
+        # 过滤后残留的行号不输出；有意义的索引（年份、相关矩阵的行名等）转成普通列
+        unnamed_rows = all(name is None for name in result.index.names) and pd.api.types.is_integer_dtype(result.index)
+        result = result.reset_index(drop=unnamed_rows)
+        return result.to_json(orient='records', force_ascii=False)
+    if isinstance(result, pd.Series):
+        return result.to_json(force_ascii=False)
+    if isinstance(result, dict):
+        return json.dumps({key: json.loads(to_json(value)) for key, value in result.items()}, ensure_ascii=False)
+    if hasattr(result, 'tolist'):
+        result = result.tolist()
+    return json.dumps(result, ensure_ascii=False)
+
+
+def call(path, query):
+    # 按路由解析参数并调用对应的接口函数，返回 (状态码, JSON 字符串)
+    if path not in ROUTES:
+        return 404, json.dumps({'error': f'unknown path {path}', 'paths': sorted(ROUTES)})
+    func, params = ROUTES[path]
+    unknown = set(query) - set(params)
+    if unknown:
+        return 400, json.dumps({'error': f'unknown parameters: {", ".join(sorted(unknown))}'})
+    try:
+        kwargs = {name: params[name](values[-1]) for name, values in query.items()}
+        return 200, to_json(func(**kwargs))
+    except (KeyError, ValueError, TypeError) as e:
+        return 400, json.dumps({'error': f'{type(e).__name__}: {e}'})
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        status, body = call(url.path, parse_qs(url.query))
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        logger.info('%s %d %.1fms', self.path, status, (time.perf_counter() - start) * 1000)
+
+    def log_message(self, format, *args):
+        # 访问日志统一走 logging
+        logger.debug(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """把每个连接交给固定大小的线程池处理，并发数受 workers 限制，不会随连接数无限增长线程。"""
+
+    def __init__(self, server_address, handler_class, workers=8):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def warm_up():
+    # 启动时加载数据并构建常用的派生结构，第一个请求不必等待
+    start = time.perf_counter()
+    for season in data_loader.SEASONS:
+        api.medal_years(season)
+        api.host_leaderboard('Total', season)
+    api.economic_metrics()
+    logger.info('warmed up in %.2fs', time.perf_counter() - start)
+
+
+def serve(host='127.0.0.1', port=8765, workers=8, warm=True):
+    if warm:
+        warm_up()
+    server = PooledHTTPServer((host, port), Handler, workers=workers)
+    logger.info('serving on http://%s:%d with %d workers', host, server.server_address[1], workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the Olympic medal analyses as JSON over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=8, help='size of the request thread pool')
+    parser.add_argument('--no-warm-up', action='store_true', help='load data lazily on the first request')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    serve(args.host, args.port, args.workers, warm=not args.no_warm_up)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
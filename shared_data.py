@@ -0,0 +1,141 @@
+"""同一台机器上多个 Streamlit 工作进程共享的只读数据表（由 publish_shared.py 发布）。
+
+发布目录默认位于 /dev/shm（共享内存），结构为 <目录>/<版本>/<数据表>/<列序号>.npy，
+当前版本及每张表的列信息记录在 <目录>/current.json 中。数值列原样保存；
+category 列只保存整数编码，类别名放在同名的 .json 里；字符串列同样编码为整数。
+工作进程以只读方式内存映射这些文件，数值列和 category 列直接建立在映射内存之上，
+不复制数据，所有进程共用同一份物理内存；类别名和字符串列在各进程中解码，且只解码用到的列
+（页面只读取赛事级奖牌表的 category 列，运动员姓名等字符串列不会被解码）。
+映射出的数组不可写，原地修改会抛出 ValueError。
+
+共享的只是原始数据表；由它们构建的派生结构（国家索引 CountryIndex、MedalCube、EventMedals、
+回归结果等）仍由每个工作进程各自构建和持有，这部分内存随工作进程数增长。
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# 设置为发布目录时启用共享模式，例如 OLYMPIC_SHARED_DATA=/dev/shm/olympic-medals
+ENV_VAR = 'OLYMPIC_SHARED_DATA'
+DEFAULT_DIR = os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'olympic-medals')
+MANIFEST_FILE = 'current.json'
+# 文件格式变化时修改，旧格式的发布被视为不存在
+FORMAT_VERSION = 2
+
+_manifest_cache = {}
+_lock = threading.Lock()
+
+
+def directory():
+    # 未设置环境变量时返回 None，即不启用共享模式
+    return os.environ.get(ENV_VAR) or None
+
+
+def load_manifest(root):
+    """当前发布的版本与各表信息；没有发布或格式不符时返回 None。"""
+    path = os.path.join(root, MANIFEST_FILE)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    entry = _manifest_cache.get(path)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        manifest = None
+    with _lock:
+        _manifest_cache[path] = (signature, manifest)
+    return manifest
+
+
+def _encode(series):
+    # 返回 (列信息, 写入文件的数组, 编码对应的取值列表或 None)
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'kind': 'category', 'ordered': bool(dtype.ordered)}, series.cat.codes.to_numpy(), dtype.categories.tolist()
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        return {'kind': 'numpy'}, series.to_numpy(), None
+    if pd.api.types.is_string_dtype(dtype):
+        codes, uniques = pd.factorize(series)
+        return {'kind': 'string', 'dtype': str(dtype)}, codes.astype('int32'), list(uniques)
+    raise TypeError(f'column {series.name!r} has unsupported dtype {dtype}')
+
+
+def _decode(info, array, labels):
+    if info['kind'] == 'category':
+        # 编码数组直接作为 Categorical 的 codes，不复制
+        dtype = pd.CategoricalDtype(labels, ordered=info['ordered'])
+        return pd.Categorical.from_codes(array, dtype=dtype, validate=False)
+    if info['kind'] == 'string':
+        return pd.array(labels, dtype=info['dtype']).take(array, allow_fill=True)
+    return array
+
+
+def write(root, tables):
+    """发布 {表名: (源数据签名, DataFrame)}，返回新版本名。
+
+    新版本的文件全部写完后才替换 current.json，读取方不会看到写了一半的版本。
+    """
+    version = f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}'
+    entries = {}
+    for name, (signature, df) in tables.items():
+        table_dir = os.path.join(root, version, name)
+        os.makedirs(table_dir)
+        columns = []
+        for i, column in enumerate(df.columns):
+            info, array, labels = _encode(df[column])
+            np.save(os.path.join(table_dir, f'{i:03d}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+            if labels is not None:
+                with open(os.path.join(table_dir, f'{i:03d}.json'), 'w', encoding='utf-8') as f:
+                    json.dump(labels, f, ensure_ascii=False)
+            columns.append(dict(info, name=column))
+        entries[name] = {'signature': signature, 'rows': len(df), 'columns': columns}
+    manifest = {'format': FORMAT_VERSION, 'version': version, 'tables': entries}
+    path = os.path.join(root, MANIFEST_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+    return version
+
+
+def prune(root, keep):
+    # 删除 keep 以外的版本；仍在使用旧版本的进程已映射的内存在其解除映射前保持有效
+    removed = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name not in keep and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+    return removed
+
+
+def attach(root, manifest, name, columns=None):
+    """只读映射已发布的表，columns 为要读取的列（默认全部）；文件已被删除时返回 None。"""
+    entry = manifest['tables'][name]
+    table_dir = os.path.join(root, manifest['version'], name)
+    positions = {info['name']: i for i, info in enumerate(entry['columns'])}
+    data = {}
+    try:
+        for column in columns if columns is not None else positions:
+            i = positions[column]
+            array = np.load(os.path.join(table_dir, f'{i:03d}.npy'), mmap_mode='r', allow_pickle=False)
+            # 去掉 memmap 子类（仍是同一块映射内存的视图），计算结果不会带上 memmap 类型
+            array = array.view(np.ndarray)
+            labels = None
+            if entry['columns'][i]['kind'] != 'numpy':
+                with open(os.path.join(table_dir, f'{i:03d}.json'), encoding='utf-8') as f:
+                    labels = json.load(f)
+            data[column] = _decode(entry['columns'][i], array, labels)
+    except FileNotFoundError:  # 发布方已删除该版本，由调用方回退到进程内加载
+        return None
+    # 各列保持独立的块，DataFrame 不会把同类型的列合并复制成一个二维数组
+    return pd.DataFrame(data, copy=False)
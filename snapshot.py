@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # 没有 pyarrow 时只能直接读取原始文件
+    feather = None
+
+SNAPSHOT_DIR = 'snapshot'
+MANIFEST_FILE = os.path.join(SNAPSHOT_DIR, 'manifest.json')
+
+_manifest_cache = {}
+_lock = threading.Lock()
+
+
+def available():
+    return feather is not None
+
+
+def snapshot_path(name, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f'{name}.feather')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    try:
+        stat = os.stat(manifest_file)
+    except FileNotFoundError:
+        return {'sources': {}}
+    signature = (stat.st_mtime_ns, stat.st_size)
+    entry = _manifest_cache.get(manifest_file)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    with open(manifest_file, encoding='utf-8') as f:
+        manifest = json.load(f)
+    with _lock:
+        _manifest_cache[manifest_file] = (signature, manifest)
+    return manifest
+
+
+def save_manifest(manifest, manifest_file=MANIFEST_FILE):
+    tmp_file = manifest_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def source_entry(source_path):
+    stat = os.stat(source_path)
+    return {
+        'source': source_path.replace(os.sep, '/'),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(source_path),
+    }
+
+
+def _unchanged(entry, source_path):
+    stat = os.stat(source_path)
+    if stat.st_size != entry['size']:
+        return False
+    if stat.st_mtime_ns == entry['mtime_ns']:
+        return True
+    # mtime 变化（例如重新 checkout）时再用哈希确认内容是否真的改变
+    return file_sha256(source_path) == entry['sha256']
+
+
+def depends_entry(paths):
+    # 快照内容还依赖的其他文件（如按主办表划分季节的分区），记入 manifest 的 depends
+    return {path.replace(os.sep, '/'): source_entry(path) for path in paths}
+
+
+def is_fresh(name, source_path, snapshot_dir=SNAPSHOT_DIR, version=1, depends=()):
+    entry = load_manifest(os.path.join(snapshot_dir, 'manifest.json'))['sources'].get(name)
+    if entry is None or not os.path.exists(snapshot_path(name, snapshot_dir)):
+        return False
+    if entry.get('version', 1) != version:
+        return False
+    recorded = entry.get('depends', {})
+    for path in depends:
+        key = path.replace(os.sep, '/')
+        if key not in recorded or not _unchanged(recorded[key], path):
+            return False
+    return _unchanged(entry, source_path)
+
+
+def read(name, source_path, columns=None, snapshot_dir=SNAPSHOT_DIR, version=1, depends=()):
+    # 快照不可用或已过期时返回 None，由调用方回退到原始文件；depends 为快照还依赖的其他文件
+    if feather is None or not is_fresh(name, source_path, snapshot_dir, version, depends):
+        return None
+    table = feather.read_table(snapshot_path(name, snapshot_dir),
+                               columns=list(columns) if columns is not None else None,
+                               memory_map=True)
+    return table.to_pandas()
+
+
+def write(name, df, snapshot_dir=SNAPSHOT_DIR):
+    # 不压缩，读取时可以直接内存映射
+    path = snapshot_path(name, snapshot_dir)
+    tmp_path = path + '.tmp'
+    feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+    return path
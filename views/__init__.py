@@ -0,0 +1,31 @@
+"""各分析页面，选中时才导入对应模块及其依赖（plotly 等）。
+
+每个页面模块提供 sidebar()（绘制侧边栏控件并返回选项）和 render(**options)。
+"""
+import importlib
+import logging
+import time
+
+PAGES = {
+    'Overall Overview': 'views.overview',
+    'Host Advantage': 'views.host_advantage',
+    'Impact on Economic Strength': 'views.economic_strength',
+    'Bonus for Strong Events': 'views.strong_events',
+    'Athlete Search': 'views.athletes',
+}
+
+logger = logging.getLogger(__name__)
+
+# 模块名 -> 首次导入耗时（秒）
+import_times = {}
+
+
+def load_page(name):
+    module_name = PAGES[name]
+    if module_name not in import_times:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        import_times[module_name] = time.perf_counter() - start
+        logger.info('imported %s in %.3fs', module_name, import_times[module_name])
+        return module
+    return importlib.import_module(module_name)
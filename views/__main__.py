@@ -0,0 +1,39 @@
+"""启动耗时报告: python -m views
+
+在独立的子进程中冷启动，分别统计应用入口依赖和每个页面模块的导入耗时。
+"""
+import subprocess
+import sys
+
+import views
+
+BASE_IMPORTS = 'import streamlit, data_loader, views'
+
+PROBE = '''
+import time
+start = time.perf_counter()
+{base}
+base = time.perf_counter() - start
+start = time.perf_counter()
+import {module} as page
+page_import = time.perf_counter() - start
+print(f'{{base:.3f}} {{page_import:.3f}}')
+'''
+
+
+def measure(module_name):
+    code = PROBE.format(base=BASE_IMPORTS, module=module_name)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    base, page_import = (float(value) for value in output.split())
+    return base, page_import
+
+
+def main():
+    print(f'{"page":<32}{"base import (s)":>18}{"page import (s)":>18}')
+    for name, module_name in views.PAGES.items():
+        base, page_import = measure(module_name)
+        print(f'{name:<32}{base:>18.3f}{page_import:>18.3f}')
+
+
+if __name__ == '__main__':
+    main()
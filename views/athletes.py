@@ -0,0 +1,57 @@
+import plotly.express as px
+import streamlit as st
+
+import roster
+from views import debug
+
+
+def sidebar():
+    query = st.text_input('Search Athletes by Name', placeholder='e.g. ZHANG or Katrine')
+    return {'query': query}
+
+
+def render(query):
+    st.markdown("## Athlete Search")
+    # 名册与前缀索引每个进程只构建一次（xlsx 首次解析后写成快照）
+    athlete_roster = roster.get_roster()
+
+    if not query.strip():
+        st.info(f"{len(athlete_roster.athletes)} athletes in the roster. Type a name prefix in the sidebar to search.")
+        return
+
+    results = athlete_roster.search(query)
+    if results.empty:
+        st.warning(f"No athletes found for '{query}'")
+        return
+
+    col1, col2 = st.columns([2, 1.15])
+
+    with col1:
+        st.markdown(f"### {len(results)} athletes matching '{query}'" + (" (first results shown)" if len(results) >= roster.MAX_RESULTS else ""))
+        st.dataframe(results[['Name', 'Country', 'Discipline']], hide_index=True)
+
+    with col2:
+        selected_country = st.selectbox('Choose a country to view its athletes by discipline', results['Country'].astype(str).unique())
+        counts = athlete_roster.discipline_counts(selected_country).head(15).reset_index(name='Athletes')
+
+        fig = px.bar(counts,
+                    x='Athletes',
+                    y='Discipline',
+                    orientation='h',
+                    title=f'{selected_country} Athletes by Discipline',
+                    color='Athletes',
+                    color_continuous_scale='Blues')
+
+        fig.update_layout(
+            yaxis=dict(autorange='reversed'),
+            template='plotly',
+            hoverlabel=dict(
+                font=dict(
+                    family="Arial Black",  
+                    size=16,  
+                    color="black"  
+                )
+            )
+        )
+
+        debug.plotly_chart(fig)
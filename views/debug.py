@@ -0,0 +1,41 @@
+"""侧边栏调试面板：显示本次运行各阶段（读取、聚合、表格渲染、图表构建与序列化）的耗时。
+
+在地址后加 ?debug=1 开启，?debug=alloc 同时记录内存分配（tracemalloc 会拖慢运行）；
+也可以用环境变量 OLYMPIC_DEBUG 设置同样的值，对所有会话生效。
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+import instrument
+
+
+def mode():
+    # None（关闭）、'time' 或 'alloc'
+    value = st.query_params.get('debug') or os.environ.get('OLYMPIC_DEBUG')
+    if not value or value == '0':
+        return None
+    return 'alloc' if value == 'alloc' else 'time'
+
+
+def plotly_chart(fig, **kwargs):
+    # 图表转成 JSON 并发送到前端的时间单独记为一个阶段
+    with instrument.stage('serialize:plotly_chart'):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def panel(recorder):
+    with st.sidebar.expander('Debug: stage timings', expanded=True):
+        st.markdown(f'**{recorder.label}**: {recorder.total_ms:.1f} ms in total')
+        if not recorder.stages:
+            st.caption('No instrumented stages ran (everything came from cache).')
+        else:
+            table = pd.DataFrame(recorder.stages)
+            # 子阶段缩进显示在所属阶段之下
+            table['name'] = [' ' * depth + ('↳ ' if depth else '') + name
+                             for depth, name in zip(table['depth'], table['name'])]
+            columns = ['name', 'ms', 'self_ms'] + [column for column in ['alloc_kb', 'peak_kb'] if column in table]
+            st.dataframe(table[columns].round(1), hide_index=True)
+        if recorder.profile_path:
+            st.caption(f'cProfile written to {recorder.profile_path}')
@@ -0,0 +1,289 @@
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+import api
+import data_loader
+import disk_cache
+import panel
+from views import debug
+
+# 跨国比较可选的指标 -> panel.medal_metrics() 中的列
+COMPARISON_METRICS = {
+    'Medals per Million People': 'Total_per_Million',
+    'Gold Medals per Million People': 'Gold_per_Million',
+    'Medals per Trillion USD GDP': 'Total_per_Trillion_GDP',
+    'Gold Medals per Trillion USD GDP': 'Gold_per_Trillion_GDP',
+}
+
+
+def sidebar():
+    chart_type = st.selectbox('Choose a Chart Type', ['Line Chart', 'Heatmap', 'Cross-Country Comparison'])
+    options = {'chart_type': chart_type}
+    if chart_type != 'Cross-Country Comparison':
+        # 只能选择有 GDP 序列的国家
+        options['selected_country'] = st.selectbox('Choose a Country', panel.get_panel().countries_with('GDP'))
+    return options
+
+
+def _heatmap_figure(selected_country, start_year, end_year, metrics):
+    # 年份区间内所选指标的相关系数矩阵；各指标按年份的前缀和只构建一次，任意区间的相关系数直接由前缀和得出
+    heatmap_data_filtered = api.economic_correlation_engine(selected_country).corr(start_year, end_year, list(metrics))
+
+    fig = go.Figure(data=go.Heatmap(
+        z=heatmap_data_filtered.values, 
+        x=heatmap_data_filtered.columns, 
+        y=heatmap_data_filtered.index,    
+        colorscale='Blues',  
+        colorbar=dict(title='Correlation'),  
+        zmin=-1, zmax=1, 
+        text=heatmap_data_filtered.round(2).values,  
+        hoverinfo='text',  
+        showscale=True,  
+    ))
+
+    fig.update_layout(
+        title=f'Correlation between selected metrics from {start_year} to {end_year}',
+        xaxis_title='Metrics',
+        yaxis_title='Metrics',
+        template='plotly',  
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=18,  
+                color="black"  
+            )
+        )
+    )
+    return fig
+
+
+def _line_figure(selected_country):
+    # 该国 GDP 与奖牌数的双轴折线，高亮主办夏季奥运会的年份
+    medals_df = data_loader.load_medals(columns=data_loader.MEDAL_TABLE_COLUMNS)
+    # 所有国家每年的奖牌数和 GDP 已一次性对齐，这里只取出该国有 GDP 数据的年份
+    metrics = panel.get_medal_metrics(medals_df)
+    data = metrics[(metrics['Country'] == selected_country) & metrics['GDP'].notna()]
+    data = data.rename(columns={'Gold': 'Gold_Medals', 'Silver': 'Silver_Medals', 'Bronze': 'Bronze_Medals', 'Total': 'Total_Medals'})
+    data = data[data['Year'] >= 1984]
+    fig = go.Figure()
+
+    # 中国GDP的折线图（左轴）
+    fig.add_trace(go.Scatter(
+        x=data['Year'], 
+        y=data['GDP'], 
+        mode='lines+markers',
+        name=f'{selected_country} GDP',
+        line=dict(color='#1f77b4'),  
+        yaxis='y1'
+    ))
+
+    # 中国奖牌总数的折线图（右轴）
+    fig.add_trace(go.Scatter(
+        x=data['Year'], 
+        y=data['Total_Medals'], 
+        mode='lines+markers',
+        name='Total Medals',
+        line=dict(color='#9b59b6'),  
+        yaxis='y2'
+    ))
+
+    # 中国金牌数量的折线图（右轴）
+    fig.add_trace(go.Scatter(
+        x=data['Year'], 
+        y=data['Gold_Medals'], 
+        mode='lines+markers',
+        name='Gold Medals',
+        line=dict(color='#f39c12'),  
+        yaxis='y2'
+    ))
+
+    # 高亮东道主年份的奖牌总数和金牌总数
+    # 主办国名与所选国家的写法可能不同，按统一的国家 ID 匹配
+    highlight_hosts = data[data['Year'].isin(api.host_years(selected_country))]
+    highlight_label = ', '.join(str(year) for year in highlight_hosts['Year'])
+
+    # 高亮东道主年份奖牌总数的标记
+    fig.add_trace(go.Scatter(
+        x=highlight_hosts['Year'], 
+        y=highlight_hosts['Total_Medals'], 
+        mode='markers',
+        name=f'{highlight_label} Total Medals (Highlight)',
+        marker=dict(color='#9b59b6', size=10, symbol='circle'),
+        showlegend=False,  
+        yaxis='y2'
+    ))
+
+    # 高亮东道主年份金牌数量的标记
+    fig.add_trace(go.Scatter(
+        x=highlight_hosts['Year'], 
+        y=highlight_hosts['Gold_Medals'], 
+        mode='markers',
+        name=f'{highlight_label} Gold Medals (Highlight)',
+        marker=dict(color='#f39c12', size=10, symbol='circle'),
+        showlegend=False, 
+        yaxis='y2'
+    ))
+
+    # 设置x轴的时间间隔为4年
+    fig.update_layout(
+        title=f'{selected_country} GDP and Medal Counts Over the Years',
+        xaxis=dict(
+            title='Year',
+            tickmode='array',  
+            tickvals=list(range(1984, data['Year'].max()+1, 4)),  
+            ticktext=[str(year) for year in range(1984, data['Year'].max()+1, 4)]  
+        ),
+        yaxis=dict(
+            title=f'{selected_country} GDP (Trillions Dollars)',
+            titlefont=dict(color='#1f77b4'),  
+            tickfont=dict(color='#1f77b4'), 
+            side='left'
+        ),
+        yaxis2=dict(
+            title='Medals Count',
+            titlefont=dict(color='#9b59b6'),  
+            tickfont=dict(color='#9b59b6'),  
+            overlaying='y',  
+            side='right'
+        ),
+        legend=dict(x=0.1, y=0.9),
+        template='plotly_white',  
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=18, 
+                color="black"  
+            )
+        )
+    )
+    return fig
+
+
+def _comparison_figure(selected_year, metric_label, top_n):
+    # 某一年按所选指标排名前 top_n 的国家；没有数据时为 None
+    metrics = panel.get_medal_metrics(data_loader.load_medals(columns=data_loader.MEDAL_TABLE_COLUMNS))
+    metric_column = COMPARISON_METRICS[metric_label]
+    data = metrics[metrics['Year'] == selected_year].dropna(subset=[metric_column]).nlargest(top_n, metric_column)
+    if data.empty:
+        return None
+
+    fig = px.bar(data,
+                x='Country',
+                y=metric_column,
+                title=f'{metric_label} in {selected_year}',
+                labels={'Country': 'Country', metric_column: metric_label},
+                hover_data=['Gold', 'Total', 'Population', 'GDP'],
+                color=metric_column,
+                color_continuous_scale='Blues')
+
+    fig.update_layout(
+        xaxis_tickangle=45,
+        template='plotly',
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=18,  
+                color="black"  
+            )
+        )
+    )
+    return fig
+
+
+def render(chart_type, selected_country=None):
+    medals_df = data_loader.load_medals(columns=data_loader.MEDAL_TABLE_COLUMNS)
+    economic_panel = panel.get_panel()
+
+    st.markdown("## Impact on Economic Strength")
+    
+    if chart_type == 'Heatmap':
+        st.markdown("### Heatmap")
+        gdp_data = economic_panel.series(selected_country, panel.GDP_INDICATORS)
+
+        col1, col2 = st.columns([3, 2])  #
+        
+        with col2:
+            start_year = st.selectbox("Choose the Starting Year", options=range(int(gdp_data['Year'].min()), int(gdp_data['Year'].max()) + 1), index=0)
+            end_year = st.selectbox("Choose the Ending Year", options=range(int(gdp_data['Year'].min()), int(gdp_data['Year'].max()) + 1), index=int(gdp_data['Year'].max()) - int(gdp_data['Year'].min()))
+        
+        if start_year > end_year:
+            st.warning("The starting year must be earlier than the ending year. Please choose again")
+
+        with col2:
+            st.subheader("Choose the indicators you want to view")
+            metrics = []
+            if st.checkbox("GDP"):
+                metrics.append("GDP")
+            if st.checkbox("GDP_WorldPercent"):
+                metrics.append("GDP_WorldPercent")
+            if st.checkbox("Gold"):
+                metrics.append("Gold")
+            if st.checkbox("Total_Medals"):
+                metrics.append("Total_Medals")
+            if not metrics:
+                metrics = ["GDP", "GDP_WorldPercent", "Gold", "Total_Medals"]
+
+        if len(metrics) > 1:  
+            with col1:
+                debug.plotly_chart(_cached('heatmap', selected_country, start_year, end_year, tuple(metrics)))
+        else:
+            st.warning("Please select at least two indicators to calculate the correlation")
+
+
+    elif chart_type == 'Line Chart':
+        st.markdown("### Line Chart")
+        debug.plotly_chart(_cached('line', selected_country))
+
+    elif chart_type == 'Cross-Country Comparison':
+        st.markdown("### Cross-Country Comparison")
+        # 所有国家、所有年份的人均和单位 GDP 奖牌数已批量算好
+        metrics = panel.get_medal_metrics(medals_df)
+
+        col1, col2 = st.columns([3, 2])
+
+        with col2:
+            years = sorted(metrics['Year'].unique(), reverse=True)
+            selected_year = st.selectbox("Choose a year", years)
+            metric_label = st.selectbox("Choose a metric", list(COMPARISON_METRICS))
+            top_n = st.slider("Number of countries", min_value=5, max_value=50, value=20)
+
+        fig = _cached('comparison', int(selected_year), metric_label, top_n)
+        if fig is None:
+            st.warning("No economic data is available for this year and metric")
+        else:
+            with col1:
+                debug.plotly_chart(fig)
+
+
+# ---- 部署时预热（warmup.py）----
+
+NAMESPACE = 'economic_strength'
+
+WARM_BUILDERS = {
+    'heatmap': _heatmap_figure,
+    'line': _line_figure,
+    'comparison': _comparison_figure,
+}
+
+
+def _cached(kind, *args):
+    return disk_cache.get(NAMESPACE, (kind,) + args, lambda: WARM_BUILDERS[kind](*args))
+
+
+def warm_states(recent=None):
+    """各国的折线图和默认的热力图（全部年份、全部指标）、各年份各指标的跨国比较（默认的前 20 个国家）。
+
+    热力图的年份区间和指标勾选、比较图的国家数可以自由组合，只预热默认值；recent 为 N 时比较图只包含最近 N 届。
+    """
+    economic_panel = panel.get_panel()
+    states = []
+    for country in economic_panel.countries_with('GDP'):
+        gdp_data = economic_panel.series(country, panel.GDP_INDICATORS)
+        states.append(('line', (country,)))
+        states.append(('heatmap', (country, int(gdp_data['Year'].min()), int(gdp_data['Year'].max()), tuple(api.HEATMAP_METRICS))))
+    metrics = panel.get_medal_metrics(data_loader.load_medals(columns=data_loader.MEDAL_TABLE_COLUMNS))
+    years = sorted(metrics['Year'].unique(), reverse=True)
+    for year in years[:recent] if recent else years:
+        states += [('comparison', (int(year), metric_label, 20)) for metric_label in COMPARISON_METRICS]
+    return states
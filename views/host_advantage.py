@@ -0,0 +1,276 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+import api
+import data_loader
+import disk_cache
+from views import debug
+
+
+def sidebar():
+    season = st.radio('Choose a Season', data_loader.SEASONS, horizontal=True)
+    selected_country = st.selectbox('Choose a Country', api.medal_countries(season))
+    medal_type = st.selectbox('Choose a Medal Type', ['Gold', 'Silver', 'Bronze', 'Total'])
+    chart_type = st.selectbox('Choose a Chart Type', ['Line Chart', 'Box Plot', 'Regression Analysis', 'Host Advantage Leaderboard'])
+    return {'selected_country': selected_country, 'medal_type': medal_type, 'chart_type': chart_type, 'season': season}
+
+
+def _line_figure(selected_country, medal_type, season):
+    # 各届奖牌数折线，高亮东道主年份并标出平均值；该国按年份排好序的奖牌数及东道主标记直接从预先构建的时间序列中切片
+    country_medals = api.country_series(selected_country, season)
+    host_medals = country_medals[country_medals['Is_Host'].to_numpy(bool)]
+
+    fig = go.Figure()
+
+    # 奖牌类型的折线
+    fig.add_trace(go.Scatter(x=country_medals['Year'], y=country_medals[medal_type], mode='lines+markers',
+                            name=medal_type, line=dict(width=2, color='blue'), marker=dict(size=8, color='blue')))
+
+    # 高亮显示东道主年份，所有东道主年份放在同一条轨迹中
+    highlight_marker_color = 'rgba(255, 99, 71, 0.6)'  
+    if not host_medals.empty:
+        fig.add_trace(go.Scatter(
+            x=host_medals['Year'],
+            y=host_medals[medal_type],
+            mode='markers',
+            marker=dict(size=12, color=highlight_marker_color, symbol='circle'),
+            name='Host Years',
+            hoverinfo='text',  
+            hovertext=[f"Host Year: {year}" for year in host_medals['Year']]
+        ))
+
+    # 计算该国家奖牌的平均值
+    average_medal_value = country_medals[medal_type].mean()
+
+    # 平均值的虚线
+    fig.add_shape(
+        type="line",
+        x0=country_medals['Year'].min(), x1=country_medals['Year'].max(), 
+        y0=average_medal_value, y1=average_medal_value,  
+        line=dict(
+            color="red", 
+            width=2,  
+            dash="dash"  
+        ),
+        name="Average",  
+        legendgroup="average",  
+        showlegend=True  
+    )
+
+    fig.update_layout(
+        title=f"{selected_country} {medal_type} Medal History",
+        xaxis_title="Year",
+        yaxis_title="Medals Count",
+        hovermode="x unified",  
+        template="plotly_dark",  
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=16,  
+                color="black"  
+            ),
+            bgcolor="rgba(255, 255, 255, 0.8)",  
+            bordercolor="gray"  
+        )
+    )
+    return fig
+
+
+def _box_figure(selected_country, season):
+    # 金银铜及总数的分布箱线图
+    country_medals = api.country_series(selected_country, season)
+
+    fig2 = px.box(country_medals,
+                y=['Gold', 'Silver', 'Bronze', 'Total'],
+                title=f"{selected_country} Medal Distribution Boxplot",
+                color='variable',
+                color_discrete_map={
+                    'Gold': '#1f77b4',
+                    'Silver': '#4682b4',
+                    'Bronze': '#5f9ea0',
+                    'Total': '#87cefa'
+                })
+
+    fig2.update_traces(marker=dict(color='black', size=6),
+                    line=dict(width=3, color='darkblue'),
+                    boxmean='sd',
+                    boxpoints=False,
+                    jitter=0)
+
+    fig2.update_layout(
+        yaxis_title='Medals Count',
+        showlegend=False,
+        template="plotly_dark",
+        plot_bgcolor='rgba(0, 0, 0, 0)',  
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=16, 
+                color="black"  
+            ),
+            bgcolor="rgba(255, 255, 255, 0.8)",  
+            bordercolor="gray"  
+        )
+    )
+    return fig2
+
+
+def _regression_figure(selected_country, medal_type, season):
+    # 奖牌数对东道主哑变量的回归
+    country_medals = api.country_series(selected_country, season)
+    # OLS 回归结果：所有国家、所有奖牌类型已一次算好，这里只查表
+    model = api.host_advantage(selected_country, medal_type, season)
+
+    intercept = model['intercept']
+    slope = model['slope']
+    r_value = model['r_squared']
+
+    fig3 = go.Figure()
+
+    fig3.add_trace(go.Scatter(
+        x=country_medals['Is_Host'],
+        y=country_medals[medal_type],
+        mode='markers',
+        name=f'{medal_type} Medals',
+        marker=dict(color='blue', size=10, opacity=0.7)
+    ))
+
+    x_vals = np.array([0, 1])  
+    y_vals = intercept + slope * x_vals  
+
+    fig3.add_trace(go.Scatter(
+        x=x_vals,
+        y=y_vals,
+        mode='lines',
+        name=f'Regression Line',
+        line=dict(color='red', width=2)
+    ))
+
+    fig3.update_layout(
+        title=f"Regression Analysis: {medal_type} Medals vs Host Year",
+        xaxis_title="Host Year (0=Non-Host, 1=Host)",
+        yaxis_title=f'{medal_type} Medals',
+        hovermode="closest",  
+        template="plotly_dark",  
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=16,  
+                color="black"  
+            ),
+            bgcolor="rgba(255, 255, 255, 0.8)",  
+            bordercolor="gray" 
+        )
+    )
+
+    fig3.add_annotation(
+        x=0.5,
+        y=0.95,
+        text=f"R-squared: {r_value:.2f}",
+        showarrow=False,
+        font=dict(size=14, color='white'),
+        align="center",
+        bgcolor="rgba(0, 0, 0, 0.7)",
+        borderpad=4,
+    )
+    return fig3
+
+
+def _leaderboard_figure(medal_type, season):
+    # 各主办国的东道主效应及其标准误
+    leaderboard = api.host_leaderboard(medal_type, season)
+
+    fig4 = px.bar(leaderboard,
+                x='Country_Name',
+                y='slope',
+                error_y='se_slope',
+                color='r_squared',
+                color_continuous_scale='Blues',
+                title=f"Host Advantage in {medal_type} Medals (Host-Year Mean minus Non-Host Mean)",
+                labels={'Country_Name': 'Country', 'slope': f'Extra {medal_type} Medals as Host', 'r_squared': 'R-squared'})
+
+    fig4.update_layout(
+        xaxis_tickangle=45,
+        template="plotly_dark",
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=16,  
+                color="black"  
+            ),
+            bgcolor="rgba(255, 255, 255, 0.8)",  
+            bordercolor="gray" 
+        )
+    )
+    return fig4
+
+
+def render(selected_country, medal_type, chart_type, season='Summer'):
+    st.markdown("## Analysis of Host Advantage")
+    # 各图由该国按年份排好序的时间序列及预先算好的回归结果构建，部署时已预热的直接从磁盘缓存读取
+
+    if chart_type == 'Line Chart':
+        st.markdown("### Line Chart")
+        debug.plotly_chart(_cached('line', selected_country, medal_type, season))
+
+    elif chart_type == 'Box Plot':
+        st.markdown("### Box Plot")
+        debug.plotly_chart(_cached('box', selected_country, season))
+
+    elif chart_type == 'Regression Analysis':
+        st.markdown("### Regression Analysis")
+        debug.plotly_chart(_cached('regression', selected_country, medal_type, season))
+
+    elif chart_type == 'Host Advantage Leaderboard':
+        st.markdown("### Host Advantage Leaderboard")
+        # 所有主办过夏季奥运会的国家，按东道主年份比非东道主年份多获得的奖牌数排序
+        leaderboard = api.host_leaderboard(medal_type, season)
+
+        debug.plotly_chart(_cached('leaderboard', medal_type, season))
+
+        st.dataframe(
+            leaderboard[['Country_Name', 'n_host', 'n', 'intercept', 'slope', 'se_slope', 't_slope', 'r_squared']].rename(columns={
+                'Country_Name': 'Country',
+                'n_host': 'Host Games',
+                'n': 'Games',
+                'intercept': 'Non-Host Mean',
+                'slope': 'Host Effect',
+                'se_slope': 'Std. Error',
+                't_slope': 't',
+                'r_squared': 'R-squared',
+            }),
+            hide_index=True,
+        )
+
+
+# ---- 部署时预热（warmup.py）----
+
+NAMESPACE = 'host_advantage'
+MEDAL_TYPES = ['Gold', 'Silver', 'Bronze', 'Total']
+
+WARM_BUILDERS = {
+    'line': _line_figure,
+    'box': _box_figure,
+    'regression': _regression_figure,
+    'leaderboard': _leaderboard_figure,
+}
+
+
+def _cached(kind, *args):
+    return disk_cache.get(NAMESPACE, (kind,) + args, lambda: WARM_BUILDERS[kind](*args))
+
+
+def warm_states(recent=None):
+    # 所有国家、奖牌类型和图表；与届数无关，recent 不起作用
+    states = []
+    for season in data_loader.SEASONS:
+        for country in api.medal_countries(season):
+            country = str(country)
+            states.append(('box', (country, season)))
+            for medal_type in MEDAL_TYPES:
+                states.append(('line', (country, medal_type, season)))
+                states.append(('regression', (country, medal_type, season)))
+        states += [('leaderboard', (medal_type, season)) for medal_type in MEDAL_TYPES]
+    return states
@@ -0,0 +1,428 @@
+from itertools import combinations_with_replacement, permutations
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import countries
+import data_loader
+import disk_cache
+import event_medals
+import instrument
+import medal_cube
+from views import debug
+
+
+def _map_counts(cube, index):
+    # 各年份按 ISO-3 代码汇总的奖牌数；历史代表团（如东西德）归到今天的国家，同一届合并
+    return _iso3_counts(cube.counts, index)
+
+
+def _extend_map_counts(map_counts, frames, deltas):
+    # 汇总表追加了新一届（增量为新增年份的 counts）时只汇总新年份，接在原结果之后
+    cube_delta, index_delta = deltas
+    if cube_delta is None or index_delta is not None:
+        return None
+    added = _iso3_counts(cube_delta, frames[1])
+    return pd.concat([map_counts, added]), added
+
+
+def _iso3_counts(counts, index):
+    counts = counts[['Gold', 'Silver', 'Bronze', 'Total']].reset_index()
+    counts['ISO3'] = index.iso3(index.ids_for_names(counts['Country_Name'])).to_numpy()
+    counts['Country_Name'] = counts['Country_Name'].astype(str)
+    counts = counts.dropna(subset=['ISO3'])
+    return counts.groupby(['Year', 'ISO3'], observed=True).agg(
+        Country_Name=('Country_Name', ' / '.join),
+        Gold=('Gold', 'sum'),
+        Silver=('Silver', 'sum'),
+        Bronze=('Bronze', 'sum'),
+        Total=('Total', 'sum'),
+    )
+
+
+# 奖牌表每页的行数，以及缓存的表格 HTML 数量
+TABLE_PAGE_SIZE = 100
+TABLE_HTML_CACHE_SIZE = 128
+
+
+def _added_years(deltas):
+    # 由新增年份的 counts 得到新增的年份
+    return set(deltas[0].index.get_level_values('Year').astype(int))
+
+
+def _keep_table_html(cache, frames, deltas):
+    # 追加新一届后，只涉及更早年份的表格 HTML 仍然有效
+    first = min(_added_years(deltas))
+    return cache.copy(lambda key: max(key[0] if isinstance(key[0], tuple) else (key[0],)) < first), None
+
+
+def _keep_map_figures(cache, frames, deltas):
+    # 追加新一届后，单个年份的地图仍然有效，包含所有年份的动画需要重建
+    return cache.copy(lambda key: key[0] != 'all'), None
+
+
+@instrument.timed('styler:medal_table')
+def _medal_table_html(medal_counts, period, page=1, season='Summer'):
+    # 渲染某一年（或 (起始, 结束) 年份区间）奖牌表的一页；条形图按整张表的最大值缩放，各页长度可比
+    table = medal_counts.reset_index()[['Country_Name', 'Gold', 'Silver', 'Bronze', 'Total']]
+    page_table = table.iloc[(page - 1) * TABLE_PAGE_SIZE:page * TABLE_PAGE_SIZE]
+    label = f'{period[0]}–{period[1]}' if isinstance(period, tuple) else period
+    styled_df = page_table.style.set_caption(f'Medals by Country: {season} Olympic Games {label}')\
+        .bar(subset=['Gold'], color='#f0c05a', width=100, vmax=table['Gold'].max())\
+        .bar(subset=['Silver'], color='#c0c0c0', width=100, vmax=table['Silver'].max())\
+        .bar(subset=['Bronze'], color='#a97142', width=100, vmax=table['Bronze'].max())\
+        .set_table_styles([
+            {'selector': 'thead th', 'props': [('background-color', '#f1f1f1'), ('color', '#000')]},  # 头部背景
+            {'selector': 'tbody td', 'props': [('background-color', 'white'), ('color', '#000')]},  # 数据背景
+            {'selector': 'tr:nth-child(even)', 'props': [('background-color', '#f9f9f9')]},  # 隔行背景
+        ])\
+        .hide(axis='index')  
+
+    return styled_df.to_html()
+
+
+# 地图对象较大（含 geo 布局），只保留最近使用的若干张
+MAP_FIGURE_CACHE_SIZE = 48
+
+
+def _style_map(fig_map):
+    fig_map.update_geos(
+        visible=True,
+        showcoastlines=True,
+        coastlinecolor="Black",
+        projection_type="mercator",  
+        showland=True,
+        landcolor="rgb(255, 255, 255)",
+        showlakes=True,
+        lakecolor="rgb(255, 255, 255)"
+    )
+
+    fig_map.update_layout(
+        geo=dict(
+            visible=True,
+            projection_type="natural earth",
+            scope="world",  
+            center={"lat": 0, "lon": 0},
+            showframe=False,
+            showcoastlines=True
+        ),
+        autosize=True,  
+        width=1200,  
+        height=800,  
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=16,  
+                color="black" 
+            )
+        )
+    )
+    return fig_map
+
+
+@instrument.timed('figure:map')
+def _map_figure(medal_counts_map, medal_type, title):
+    fig_map = px.choropleth(
+        medal_counts_map,
+        locations='ISO3',
+        locationmode='ISO-3',
+        color=medal_type,
+        hover_name='Country_Name',
+        hover_data={medal_type: True, 'ISO3': False},
+        color_continuous_scale='Blues', 
+        title=title,
+        labels={medal_type: f'{medal_type} Medals'}
+    )
+    return _style_map(fig_map)
+
+
+@instrument.timed('figure:map_animation')
+def _animated_map_figure(map_counts, medal_type):
+    # 每届奥运会一帧，颜色范围固定为所有年份的最大值，切换年份时颜色可比
+    data = map_counts.reset_index()
+    fig_map = px.choropleth(
+        data,
+        locations='ISO3',
+        locationmode='ISO-3',
+        color=medal_type,
+        animation_frame='Year',
+        range_color=(0, int(data[medal_type].max())),
+        hover_name='Country_Name',
+        hover_data={medal_type: True, 'ISO3': False},
+        color_continuous_scale='Blues', 
+        title=f'{medal_type} Medals by Country, All Years',
+        labels={medal_type: f'{medal_type} Medals'}
+    )
+    return _style_map(fig_map)
+
+
+def _pie_figure(season, period, country):
+    # 某国家在某一年（或年份区间）的金银铜比例
+    country_medals = _period_counts(season, period).loc[country][['Gold', 'Silver', 'Bronze']]
+
+    # 计算奖牌比例
+    total_medals = country_medals.sum()
+    medal_ratios = country_medals / total_medals
+
+    fig = px.pie(
+        values=medal_ratios,
+        names=['Gold', 'Silver', 'Bronze'],
+        title=f"{country} Medal Proportions",
+        hole=0.4,  
+        color=['Gold', 'Silver', 'Bronze'],
+        color_discrete_map={'Gold': '#f0c05a', 'Silver': '#c0c0c0', 'Bronze': '#a97142'},
+        labels={'Gold': 'Gold', 'Silver': 'Silver', 'Bronze': 'Bronze'}
+    )
+
+    fig.update_layout(
+        template="plotly_dark",
+        showlegend=True,
+        title_x=0.28, 
+    )
+
+    fig.update_traces(
+        hovertemplate="Medal = %{label} <br> Proportion = %{percent:.2f}<extra></extra>",
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black", 
+                size=16, 
+                color="black"  
+            )
+        )
+    )
+    return fig
+
+
+def _rank_change_figure(season, from_year, to_year, medal_type):
+    # 名次变化最大的前后各 10 个国家；没有国家名次变化时为 None
+    changes = _cube(season).rank_change(from_year, to_year, medal_type).reset_index()
+    movers = changes[changes['Change'] != 0]
+    movers = pd.concat([movers.head(10), movers.tail(10)]).drop_duplicates('Country_Name').sort_values('Change')
+
+    if movers.empty:
+        return None
+
+    fig = px.bar(movers,
+                x='Change',
+                y='Country_Name',
+                orientation='h',
+                color='Change',
+                color_continuous_scale='RdBu',
+                color_continuous_midpoint=0,
+                title=f'Biggest {medal_type} Rank Changes from {from_year} to {to_year}',
+                labels={'Country_Name': 'Country', 'Change': 'Places Gained'},
+                hover_data=['From_Rank', 'To_Rank'])
+
+    fig.update_layout(
+        height=600,
+        template="plotly_dark",
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=16,  
+                color="black"  
+            )
+        )
+    )
+    return fig
+
+
+def _medal_table_section(cube, medal_counts, period, sort_by, season):
+    # 左侧为分页的奖牌表，右侧为所选国家的金银铜比例；period 为年份或 (起始, 结束) 年份
+    col1, col2 = st.columns([2, 1.15]) 
+
+    with col1:
+        # 国家很多时分页显示，每页单独渲染
+        pages = max(1, -(-len(medal_counts) // TABLE_PAGE_SIZE))
+        page = st.number_input('Page', min_value=1, max_value=pages, value=1) if pages > 1 else 1
+
+        # 同一 (年份或区间, 排序, 页) 的表格 HTML 只渲染一次；只改变右侧国家选择时直接复用
+        table_html = data_loader.cached_derived('medal_table_html', lambda cube: data_loader.LRUCache(TABLE_HTML_CACHE_SIZE), cube,
+                                                extend=_keep_table_html)
+        html_table = table_html.get((period, sort_by, page), lambda: _cached('table', season, period, sort_by, page))
+        st.markdown(f'<div class="dataframe-container">{html_table}</div>', unsafe_allow_html=True)
+
+    with col2:
+        selected_country = st.selectbox('Choose to view the gold, silver, and copper ratio of this country', medal_counts.index)
+
+        fig = _cached('pie', season, period, selected_country)
+        debug.plotly_chart(fig)
+
+
+def sidebar():
+    analysis_subtype = st.radio("Choose Display Content", ['Data', 'Map', 'Year Range', 'Rank Change'])
+    season = st.radio('Choose a Season', data_loader.SEASONS, horizontal=True)
+    return {'analysis_subtype': analysis_subtype, 'season': season}
+
+
+def render(analysis_subtype, season='Summer'):
+    medals_df = event_medals.load_medal_table(season)
+
+    # 按年份和国家预先汇总的奖牌表
+    cube = medal_cube.get_cube(medals_df)
+
+    st.markdown("## Overall Overview")
+    if analysis_subtype == 'Data':
+        st.markdown("## Medal Statistics")
+
+        years = cube.years
+        selected_year = st.selectbox('Choose a year', years)
+
+        sort_by = st.selectbox('Choose the sorting criterion', ['Gold', 'Silver', 'Bronze', 'Total'])
+
+        # 直接读取预先汇总并排好序的年份切片
+        medal_counts = cube.table(selected_year, sort_by)
+
+        _medal_table_section(cube, medal_counts, selected_year, sort_by, season)
+
+    elif analysis_subtype == 'Year Range':
+        st.markdown("## Medal Statistics over a Range of Games")
+
+        years = cube.years
+        start_year, end_year = st.select_slider('Choose a range of Games', options=years, value=(years[0], years[-1]))
+
+        sort_by = st.selectbox('Choose the sorting criterion', ['Gold', 'Silver', 'Bronze', 'Total'])
+
+        # 区间合计由按届累加的前缀和相减得到，不重新汇总区间内的行
+        medal_counts = cube.range_table(start_year, end_year, sort_by)
+        _medal_table_section(cube, medal_counts, (start_year, end_year), sort_by, season)
+
+    elif analysis_subtype == 'Rank Change':
+        st.markdown("## Rank Changes between Two Games")
+
+        years = cube.years
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            from_year = st.selectbox('From', years, index=max(len(years) - 2, 0))
+        with col2:
+            to_year = st.selectbox('To', years, index=len(years) - 1)
+        with col3:
+            medal_type = st.selectbox('Rank by', ['Gold', 'Silver', 'Bronze', 'Total'])
+
+        if from_year == to_year:
+            st.warning("Please choose two different Games to compare")
+            return
+
+        # 两届都有记录的国家；Change 为正表示名次上升
+        changes = cube.rank_change(from_year, to_year, medal_type).reset_index()
+        fig = _cached('rank_change', season, from_year, to_year, medal_type)
+        if fig is None:
+            st.info(f"No country changed its {medal_type} rank between {from_year} and {to_year}")
+        else:
+            debug.plotly_chart(fig)
+
+        st.dataframe(
+            changes.rename(columns={
+                'Country_Name': 'Country',
+                'From_Rank': f'Rank {from_year}',
+                'To_Rank': f'Rank {to_year}',
+                f'From_{medal_type}': f'{medal_type} {from_year}',
+                f'To_{medal_type}': f'{medal_type} {to_year}',
+                'Change': 'Places Gained',
+            }),
+            hide_index=True,
+        )
+
+    elif analysis_subtype == 'Map':
+        st.markdown("## Medal Distribution Map")
+
+        # 用户选择年份和奖牌类型；选择动画时所有年份放在同一张图里，在浏览器端切换
+        years = cube.years
+        animate = st.checkbox('Animate all years')
+        if not animate:
+            selected_year = st.selectbox('Choose a year', years, index=len(years)-1)  # 默认选最后一年
+        medal_type = st.selectbox('Choose a Medal Type', ['Gold', 'Silver', 'Bronze', 'Total'])
+
+        # 同一 (年份, 奖牌类型) 的图只构建一次；缓存随汇总表一起重建
+        map_figures = data_loader.cached_derived('medal_map_figures', lambda counts: data_loader.LRUCache(MAP_FIGURE_CACHE_SIZE),
+                                                 _season_map_counts(season), extend=_keep_map_figures)
+        if animate:
+            fig_map = map_figures.get(('all', medal_type), lambda: _cached('map_animation', season, medal_type))
+        else:
+            fig_map = map_figures.get((selected_year, medal_type), lambda: _cached('map', season, selected_year, medal_type))
+
+        debug.plotly_chart(fig_map)
+
+
+# ---- 部署时预热（warmup.py）----
+
+NAMESPACE = 'overview'
+MEDAL_TYPES = ['Gold', 'Silver', 'Bronze', 'Total']
+
+
+def _cube(season):
+    return medal_cube.get_cube(event_medals.load_medal_table(season))
+
+
+def _period_counts(season, period, sort_by='Total'):
+    # 某一年或 (起始, 结束) 年份区间按国家的奖牌表
+    cube = _cube(season)
+    return cube.range_table(*period, sort_by) if isinstance(period, tuple) else cube.table(period, sort_by)
+
+
+def _season_map_counts(season):
+    # 每个国家的奖牌数，直接按 ISO-3 代码定位，不再依赖 Plotly 的国家名模糊匹配
+    return data_loader.cached_derived('medal_map', _map_counts, _cube(season), countries.get_index(), extend=_extend_map_counts)
+
+
+def _table_html(season, period, sort_by, page):
+    return _medal_table_html(_period_counts(season, period, sort_by), period, page, season)
+
+
+def _year_map_figure(season, year, medal_type):
+    return _map_figure(_season_map_counts(season).loc[year].reset_index(), medal_type, f'{medal_type} Medals by Country in {year}')
+
+
+def _all_years_map_figure(season, medal_type):
+    return _animated_map_figure(_season_map_counts(season), medal_type)
+
+
+# 种类 -> 构建函数，参数即控件的取值；页面和 warmup.py 用同样的 (种类, *参数) 作为缓存键
+WARM_BUILDERS = {
+    'table': _table_html,
+    'pie': _pie_figure,
+    'rank_change': _rank_change_figure,
+    'map': _year_map_figure,
+    'map_animation': _all_years_map_figure,
+}
+
+
+def _cached(kind, *args):
+    return disk_cache.get(NAMESPACE, (kind,) + args, lambda: WARM_BUILDERS[kind](*args))
+
+
+def _table_states(season, period, sort_by):
+    pages = max(1, -(-len(_period_counts(season, period, sort_by)) // TABLE_PAGE_SIZE))
+    return [('table', (season, period, sort_by, page)) for page in range(1, pages + 1)]
+
+
+def warm_states(recent=None):
+    """页面各控件的取值组合 [(种类, 参数)]；recent 为 N 时只包含最近 N 届（年份区间另含默认的全部年份）。
+
+    单届奖牌表的饼图覆盖所有国家，年份区间只预热每种排序下默认选中的第一个国家。
+    """
+    states = []
+    for season in data_loader.SEASONS:
+        cube = _cube(season)
+        years = cube.years[-recent:] if recent else cube.years
+        for year in years:
+            for medal_type in MEDAL_TYPES:
+                states += _table_states(season, year, medal_type)
+                states.append(('map', (season, year, medal_type)))
+            states += [('pie', (season, year, str(country))) for country in cube.year_slice(year).index]
+
+        ranges = set(combinations_with_replacement(years, 2)) | {(cube.years[0], cube.years[-1])}
+        for period in sorted(ranges):
+            defaults = set()
+            for medal_type in MEDAL_TYPES:
+                states += _table_states(season, period, medal_type)
+                counts = _period_counts(season, period, medal_type)
+                if len(counts):
+                    defaults.add(str(counts.index[0]))
+            states += [('pie', (season, period, country)) for country in sorted(defaults)]
+
+        for from_year, to_year in permutations(years, 2):
+            states += [('rank_change', (season, from_year, to_year, medal_type)) for medal_type in MEDAL_TYPES]
+        states += [('map_animation', (season, medal_type)) for medal_type in MEDAL_TYPES]
+    return states
@@ -0,0 +1,177 @@
+import os
+
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+import api
+import athlete_events
+import data_loader
+import disk_cache
+from views import debug
+
+# 桑基图可选的层级
+SANKEY_LEVELS = {
+    'Country → Sport': ['Team', 'Sport'],
+    'Country → Sport → Event': ['Team', 'Sport', 'Event'],
+}
+ALL_TOP_COUNTRIES = 'All Top 20 Countries'
+
+
+def sidebar():
+    season = st.radio('Choose a Season', data_loader.SEASONS, horizontal=True)
+    chart_type = st.selectbox('Choose a Chart Type',['Bar Chart','Sankey Diagram'])
+    return {'chart_type': chart_type, 'season': season}
+
+
+def _bar_figure(selected_sport, year, season):
+    # 金牌最多的前8名国家，不足8个时用没有金牌的国家补齐
+    top_8_countries = api.strong_event_teams(selected_sport, year, season, top=8)
+
+    fig = px.bar(top_8_countries,
+                x='Team',
+                y='Gold Medals',
+                title=f'Top 8 Gold Medals in {selected_sport} by Country in {year} ({season} Olympics)',
+                labels={'Team': 'Country', 'Gold Medals': 'Number of Gold Medals'},
+                color='Gold Medals',  
+                color_continuous_scale='blues') 
+
+    fig.update_layout(
+        xaxis_tickangle=90,  
+        bargap=0.15,  
+        bargroupgap=0.1, 
+        height=600, 
+        hoverlabel=dict(
+            font=dict(
+                family="Arial Black",  
+                size=20,  
+                color="black" 
+            )
+        )
+    )
+    return fig
+
+
+def _sankey_figure(selected_year, selected_country, flow_levels, season):
+    # selected_country 为代表队名或 ALL_TOP_COUNTRIES
+    levels = SANKEY_LEVELS[flow_levels]
+
+    team = None if selected_country == ALL_TOP_COUNTRIES else selected_country
+    sankey_data = api.strong_event_flows(selected_year, team, levels, season, top=20)
+
+    nodes = sankey_data['labels']
+
+    # 各层节点的横向位置，第一层为国家
+    node_x = 0.03 + 0.57 * sankey_data['node_level'] / (len(levels) - 1)
+    node_y = [0.52] if selected_country != ALL_TOP_COUNTRIES else None
+
+    fig = go.Figure(go.Sankey(
+        node=dict(
+            pad=15,  
+            thickness=20, 
+            line=dict(color="black", width=0.5),
+            label=nodes,  
+            color='lightyellow', 
+            x=node_x,  
+            y=node_y, 
+            hoverlabel=dict(
+                font=dict(
+                    family="Arial Black",  
+                    size=12, 
+                    color="black"  
+                )
+            ),
+        ),
+        link=dict(
+            source=sankey_data['source'],  
+            target=sankey_data['target'], 
+            value=sankey_data['value'],  
+            color=sankey_data['color'],  
+            hoverlabel=dict(
+                font=dict(
+                    family="Arial Black",  
+                    size=20,  
+                    color="black"  
+                )
+            )
+        )
+    ))
+
+    fig.update_layout(
+        title=f"Gold Medals Flow by {selected_country} in {' and '.join(levels[1:])} ({selected_year} {season} Olympics)",
+        font_size=12,
+        width=600,  
+        height=500, 
+        margin=dict(
+            l=50,  
+            r=50,  
+            t=50,  
+            b=50   
+        ),
+        autosize=True  
+    )
+    return fig
+
+
+def render(chart_type, season='Summer'):
+    st.markdown("## Bonus for Strong Events")
+    if chart_type == 'Bar Chart':
+        st.markdown("### Bar Chart")
+        # 所选季节的项目、年份、代表队列表（分块读取后持久化，只加载该季节）
+        season_catalog = api.strong_event_catalog(season)
+
+        sports = season_catalog['sports']
+
+        selected_sport = st.selectbox("Select Sport", sports)
+
+        # 按年份排序
+        sorted_years = season_catalog['years']
+        year = st.selectbox("Select Year", sorted_years)
+
+        debug.plotly_chart(_cached('bar', selected_sport, year, season))
+    elif chart_type == 'Sankey Diagram':
+        st.markdown("### Sankey Diagram")
+        # 获取所有年份的唯一列表，并倒序排列（所选季节去重后的金牌表，分块读取后持久化）
+        years = api.strong_event_years(season)
+
+        selected_year = st.selectbox("Select Year", years)
+
+        # 金牌数最多的前20个国家
+        top_countries = api.strong_event_top_teams(selected_year, 20, season)
+
+        countries = top_countries['Team'].unique()
+        selected_country = st.selectbox("Select Country", list(countries) + [ALL_TOP_COUNTRIES])
+
+        flow_levels = st.selectbox("Select Flow Levels", list(SANKEY_LEVELS))
+        debug.plotly_chart(_cached('sankey', selected_year, selected_country, flow_levels, season), use_container_width=True)
+
+
+# ---- 部署时预热（warmup.py）----
+
+NAMESPACE = 'strong_events'
+
+WARM_BUILDERS = {
+    'bar': _bar_figure,
+    'sankey': _sankey_figure,
+}
+
+
+def _cached(kind, *args):
+    return disk_cache.get(NAMESPACE, (kind,) + args, lambda: WARM_BUILDERS[kind](*args))
+
+
+def warm_states(recent=None):
+    # 各季节所有 (项目, 年份) 的柱状图，以及每年前 20 个代表队（及其合计）的两种桑基图；recent 为 N 时只包含最近 N 届
+    if not os.path.exists(athlete_events.ATHLETE_EVENTS_FILE):
+        return []
+    states = []
+    for season in data_loader.SEASONS:
+        catalog = api.strong_event_catalog(season)
+        years = sorted(catalog['years'])
+        for year in years[-recent:] if recent else years:
+            states += [('bar', (sport, year, season)) for sport in catalog['sports']]
+        years = sorted(api.strong_event_years(season))
+        for year in years[-recent:] if recent else years:
+            teams = list(api.strong_event_top_teams(year, 20, season)['Team'].unique()) + [ALL_TOP_COUNTRIES]
+            states += [('sankey', (year, team, flow_levels, season)) for team in teams for flow_levels in SANKEY_LEVELS]
+    return states
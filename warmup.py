@@ -0,0 +1,130 @@
+"""部署时预先构建各页面的图表和表格 HTML，写入磁盘缓存（见 disk_cache），应用启动后直接读取。
+
+用法: python warmup.py [--pages overview host_advantage ...] [--recent N] [--jobs N] [--list]
+
+各页面的 warm_states() 列出侧边栏及页面内控件的取值组合，按块分给进程池构建，
+每块结果写成缓存目录下的一个分片文件。数据和派生结构（奖牌汇总表、回归结果等）在主进程中
+列出组合时已经加载，fork 出的工作进程直接继承，不再重复构建。
+已在当前数据版本缓存中的组合自动跳过：可以先用 --recent 只预热最近几届，之后再补全。
+"""
+import argparse
+import importlib
+import os
+import shutil
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import disk_cache
+import views
+
+# 可以预热的页面（提供 warm_states() 的页面模块）
+PAGES = {module.split('.')[-1]: module for module in views.PAGES.values()}
+
+
+def _init_worker():
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')  # 页面模块在没有 Streamlit 运行时的进程中导入
+
+
+def _build_chunk(module_name, states, directory, shard):
+    # 在工作进程中构建一块组合并写成一个分片，返回 (构建数, 失败的组合, 分片字节数, 耗时)
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    entries = {}
+    failed = []
+    for kind, args in states:
+        try:
+            entries[(kind,) + args] = module.WARM_BUILDERS[kind](*args)
+        except Exception as e:  # 单个组合失败不影响其余组合，由主进程汇总报告
+            failed.append(((kind,) + args, f'{type(e).__name__}: {e}'))
+    size = disk_cache.write_shard(directory, module.NAMESPACE, shard, entries) if entries else 0
+    return len(entries), failed, size, time.perf_counter() - start
+
+
+def plan(pages, recent=None, directory=None):
+    """每个页面尚未缓存的组合：{页面模块: [(种类, 参数)]}，以及已缓存而跳过的数量。"""
+    store = disk_cache.Store(directory or disk_cache.version_dir())
+    todo = {}
+    skipped = 0
+    for page in pages:
+        module = importlib.import_module(PAGES[page])
+        if not hasattr(module, 'warm_states'):
+            continue
+        existing = store.keys(module.NAMESPACE)
+        states = [(kind, args) for kind, args in module.warm_states(recent) if (kind,) + args not in existing]
+        skipped += len(existing)
+        todo[PAGES[page]] = states
+    return todo, skipped
+
+
+def warm(pages, recent=None, jobs=None, chunk_size=100, cache_dir=disk_cache.CACHE_DIR, out=sys.stdout):
+    start = time.perf_counter()
+    directory = disk_cache.version_dir(cache_dir)
+    todo, skipped = plan(pages, recent, directory)
+    total = sum(len(states) for states in todo.values())
+    print(f'{total} to build, {skipped} already cached in {directory} (planned in {time.perf_counter() - start:.1f}s)', file=out)
+
+    chunks = [(module_name, states[i:i + chunk_size]) for module_name, states in todo.items()
+              for i in range(0, len(states), chunk_size)]
+    # 分片名带上时间和进程号，多次运行写入同一版本目录时不会覆盖
+    prefix = f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}'
+    built = size = 0
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as executor:
+        futures = {executor.submit(_build_chunk, module_name, states, directory, f'{prefix}-{i:05d}'): module_name
+                   for i, (module_name, states) in enumerate(chunks)}
+        for done, future in enumerate(as_completed(futures), 1):
+            count, failed, chunk_bytes, seconds = future.result()
+            built += count
+            size += chunk_bytes
+            failures += failed
+            elapsed = time.perf_counter() - start
+            remaining = elapsed / (built + len(failures)) * (total - built - len(failures)) if built + len(failures) else 0
+            print(f'[{done}/{len(chunks)}] {futures[future]}: {count} in {seconds:.1f}s '
+                  f'({built + len(failures)}/{total}, {elapsed:.0f}s elapsed, ~{remaining:.0f}s left)', file=out)
+
+    for key, error in failures[:20]:
+        print(f'failed {key}: {error}', file=out)
+    if len(failures) > 20:
+        print(f'... {len(failures) - 20} more failures', file=out)
+    print(f'built {built} ({size / 1e6:.1f} MB), {len(failures)} failed, in {time.perf_counter() - start:.1f}s', file=out)
+    return built, failures
+
+
+def prune(cache_dir=disk_cache.CACHE_DIR):
+    # 删除其他数据版本的缓存目录（数据或代码更新后不再使用）
+    current = os.path.basename(disk_cache.version_dir(cache_dir))
+    for name in os.listdir(cache_dir) if os.path.isdir(cache_dir) else []:
+        if name != current and os.path.isdir(os.path.join(cache_dir, name)):
+            shutil.rmtree(os.path.join(cache_dir, name))
+            print(f'removed {os.path.join(cache_dir, name)}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute every page\'s figures and tables into the on-disk cache.')
+    parser.add_argument('--pages', nargs='+', choices=sorted(PAGES), default=sorted(PAGES), help='pages to warm (default: all)')
+    parser.add_argument('--recent', type=int, help='only warm the N most recent Games of each season')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=100, help='states built per task and written per shard')
+    parser.add_argument('--cache-dir', default=disk_cache.CACHE_DIR)
+    parser.add_argument('--list', action='store_true', help='only count the states that would be built')
+    parser.add_argument('--prune', action='store_true', help='remove caches of other data versions afterwards')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        todo, skipped = plan(args.pages, args.recent, disk_cache.version_dir(args.cache_dir))
+        for module_name, states in todo.items():
+            kinds = Counter(kind for kind, _ in states)
+            print(f'{module_name}: {len(states)} ({", ".join(f"{kind} {n}" for kind, n in kinds.items())})')
+        print(f'{skipped} already cached')
+        return 0
+    built, failures = warm(args.pages, args.recent, args.jobs, args.chunk_size, args.cache_dir)
+    if args.prune:
+        prune(args.cache_dir)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())